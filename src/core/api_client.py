@@ -1,115 +1,392 @@
 import requests
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from typing import Dict, Any, List, Optional, Tuple, Callable, Sequence, Union
 from src.core.models import Contact, ProcessingResult
+from src.core.gateway_pool import GatewayPool, GatewayNode, OutageWait
+from src.core.rate_limiter import TokenBucket
+from src.core.retry import RetryPolicy
+from src.utils.metrics import BatchMetrics
 import json
+import time
 from datetime import datetime
 
+# Request errors that count against the gateway's circuit breaker
+REQUEST_ERRORS = (requests.RequestException, ConnectionError, TimeoutError)
+
+# Gateway answers that count against its circuit breaker
+GATEWAY_ERROR_STATUSES = (500, 502, 503, 504)
+
+def request_not_sent(error: Exception) -> bool:
+    """
+    True when the request never reached the gateway (connect timeout, connection
+    refused), so sending it again, to this or another gateway, cannot text twice
+    A read timeout or dropped connection may come after the gateway took the
+    SMS: those fail without a retry
+    """
+    if isinstance(error, (requests.ConnectTimeout, ConnectionRefusedError)):
+        return True
+    if isinstance(error, requests.ConnectionError) and error.args:
+        # Refused and unresolvable hosts arrive wrapped in urllib3's MaxRetryError
+        return isinstance(getattr(error.args[0], 'reason', None), (NewConnectionError, ConnectTimeoutError))
+    return False
+
+def request_error_message(error: Exception, retryable: bool) -> str:
+    """Result error text, flagging sends the gateway may have delivered"""
+    text = str(error) or type(error).__name__
+    return text if retryable else f"Delivery unknown, not retried: {text}"
+
+def sms_payload(contact: Contact) -> Dict[str, Any]:
+    """JSON body for /api/sms/send"""
+    return {
+        "phone": contact.phone,
+        "message": contact.message,
+        "name": contact.name
+    }
+
+def batch_payload(contacts: List[Contact]) -> Dict[str, Any]:
+    """JSON body for /api/sms/batch, each contact carries its position as `id`"""
+    return {
+        "contacts": [
+            {
+                "id": i,
+                "name": contact.name,
+                "phone": contact.phone, 
+                "message": contact.message
+            }
+            for i, contact in enumerate(contacts)
+        ]
+    }
+
+def batch_timeout(timeout: float, batch_size: Optional[int], chunk_size: int) -> float:
+    """Request timeout for a batch, a full batch_size chunk gets timeout * 2"""
+    if not batch_size:
+        return timeout * 2
+    return timeout * (1 + chunk_size / batch_size)
+
+def retry_after_seconds(headers) -> Optional[float]:
+    """Seconds from a Retry-After header, None when absent or not a number"""
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+def feed_rate_limiter(rate_limiter: Optional[TokenBucket], status_code: int, headers):
+    """Let the gateway's answer steer the send rate"""
+    if rate_limiter is None:
+        return
+    if status_code == 429:
+        rate_limiter.throttle(retry_after_seconds(headers))
+    elif status_code == 200:
+        rate_limiter.recover()
+
+def observe_request(metrics: Optional[BatchMetrics], endpoint: str, started: Optional[float], status: Union[int, str]):
+    """Record a request's latency since `started` (perf_counter, taken after rate limiting) and its outcome"""
+    if metrics is not None and started is not None:
+        metrics.observe_request(endpoint, time.perf_counter() - started, str(status))
+
+def result_timestamp(value: Any, default: datetime) -> datetime:
+    """Gateway timestamp (epoch ms, epoch s or ISO string) as datetime, default when missing or unreadable"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # The Kotlin gateway reports epoch milliseconds
+        seconds = value / 1000 if value > 1e11 else value
+        try:
+            return datetime.fromtimestamp(seconds)
+        except (OverflowError, OSError, ValueError):
+            return default
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return default
+    return default
+
+def batch_results(contacts: List[Contact], response_data: Dict[str, Any]) -> List[ProcessingResult]:
+    """
+    Map a 200 batch response back onto the contacts that were sent
+    Results echoing an `id` are matched by it, otherwise by position. Contacts
+    the gateway returned nothing for are marked 'unknown' rather than guessed
+    """
+    entries = response_data.get('results') if isinstance(response_data, dict) else None
+    if not isinstance(entries, list):
+        entries = []
+    entries = [entry if isinstance(entry, dict) else {} for entry in entries]
+    
+    if entries and all('id' in entry for entry in entries):
+        by_id = {str(entry['id']): entry for entry in entries}
+        matched = [by_id.get(str(i)) for i in range(len(contacts))]
+    else:
+        matched = entries[:len(contacts)] + [None] * (len(contacts) - len(entries))
+    
+    received_at = datetime.now()
+    results = []
+    for contact, entry in zip(contacts, matched):
+        if entry is None:
+            results.append(ProcessingResult(
+                contact=contact,
+                status="unknown",
+                timestamp=received_at,
+                error_message="Gateway returned no result for this contact"
+            ))
+            continue
+        results.append(ProcessingResult(
+            contact=contact,
+            status=entry.get('status', 'unknown'),
+            timestamp=result_timestamp(entry.get('timestamp'), received_at),
+            error_message=entry.get('error')
+        ))
+    return results
+
+def failed_results(contacts: List[Contact], error_message: str) -> List[ProcessingResult]:
+    """Mark every contact of a request as failed with the same error"""
+    return [
+        ProcessingResult(
+            contact=contact,
+            status="failed",
+            timestamp=datetime.now(),
+            error_message=error_message
+        )
+        for contact in contacts
+    ]
+
 class KotlinGatewayClient:
-    def __init__(self, base_url: str = "http://localhost:8080", timeout: int = 30):
-        self.base_url = base_url
+    def __init__(self, base_url: Union[str, Sequence[str]] = "http://localhost:8080", timeout: int = 30,
+                 batch_size: Optional[int] = None, max_in_flight: int = 1, rate_limiter: Optional[TokenBucket] = None,
+                 retry_policy: Optional[RetryPolicy] = None, routing: str = "round_robin", sticky_ddd: bool = False,
+                 health_timeout: float = 5, max_outage: float = 0, failure_threshold: int = 3, eject_seconds: float = 30):
+        """
+        base_url may be a list of gateways; requests are then routed across them
+        (see GatewayPool) and each gateway is paced by its own copy of rate_limiter
+        With max_outage > 0, sends pause for up to that many seconds while every
+        gateway is ejected, instead of failing their contacts
+        """
+        self.pool = GatewayPool(base_url, routing=routing, sticky_ddd=sticky_ddd, rate_limiter=rate_limiter,
+                                eject_seconds=eject_seconds, failure_threshold=failure_threshold)
+        self.base_url = self.pool.nodes[0].url
         self.timeout = timeout
+        self.health_timeout = health_timeout
+        self.max_outage = max_outage
+        self.batch_size = batch_size
+        self.max_in_flight = max(1, max_in_flight)
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=1)
         self.session = requests.Session()
+        # Set per batch by BatchProcessor; gets every request's latency and outcome
+        self.metrics: Optional[BatchMetrics] = None
+        
+        # One pooled connection per in-flight chunk and gateway, plus one for the
+        # background health probe, so keep-alive connections are never discarded
+        adapter = HTTPAdapter(pool_connections=len(self.pool.nodes), pool_maxsize=self.max_in_flight + 1)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         
     def health_check(self) -> bool:
-        """Check if Kotlin gateway is available"""
+        """
+        Check if Kotlin gateway is available
+        Every gateway is probed; unhealthy ones are ejected, recovered ones
+        put back. True if at least one gateway is up
+        """
+        if len(self.pool.nodes) == 1:
+            return self._probe(self.pool.nodes[0])
+        with ThreadPoolExecutor(max_workers=len(self.pool.nodes)) as executor:
+            return any(list(executor.map(self._probe, self.pool.nodes)))
+    
+    def _probe(self, node: GatewayNode) -> bool:
+        """Health check a single gateway and update its pool state"""
         try:
             response = self.session.get(
-                f"{self.base_url}/health",
-                timeout=5
+                f"{node.url}/health",
+                timeout=self.health_timeout
             )
-            return response.status_code == 200
+            healthy = response.status_code == 200
         except:
-            return False
+            healthy = False
+        if healthy:
+            self.pool.mark_up(node)
+        else:
+            self.pool.eject(node)
+        return healthy
     
     def send_sms(self, contact: Contact) -> ProcessingResult:
-        """Send single SMS via Kotlin gateway"""
+        """
+        Send single SMS via Kotlin gateway, paced by the rate limiter when set
+        Transient failures are retried per the retry policy, each attempt
+        routed anew so an ejected gateway's traffic moves to the others
+        """
+        outage = OutageWait(self.pool, self.max_outage)
+        attempt = 1
+        while True:
+            self._wait_outage(outage)
+            result, retryable = self._post_sms(contact)
+            result.attempts = attempt
+            if retryable and outage.ongoing():
+                # Every gateway is down: wait for one instead of spending an attempt
+                continue
+            if not retryable or attempt >= self.retry_policy.max_attempts:
+                return result
+            time.sleep(self.retry_policy.backoff(attempt))
+            attempt += 1
+    
+    def _post_sms(self, contact: Contact) -> Tuple[ProcessingResult, bool]:
+        """One /api/sms/send attempt, returns (result, worth retrying)"""
+        node = self.pool.pick(contact)
+        started = None
         try:
-            payload = {
-                "phone": contact.phone,
-                "message": contact.message,
-                "name": contact.name
-            }
-            
-            response = self.session.post(
-                f"{self.base_url}/api/sms/send",
-                json=payload,
-                timeout=self.timeout
-            )
+            with self.pool.lease(node):
+                self._pace(node, 1)
+                started = time.perf_counter()
+                response = self.session.post(
+                    f"{node.url}/api/sms/send",
+                    json=sms_payload(contact),
+                    timeout=self.timeout
+                )
+            observe_request(self.metrics, "sms_send", started, response.status_code)
+            feed_rate_limiter(node.rate_limiter, response.status_code, response.headers)
             
             if response.status_code == 200:
+                self.pool.record_success(node, 1)
                 return ProcessingResult(
                     contact=contact,
                     status="sent",
                     timestamp=datetime.now()
-                )
+                ), False
             else:
+                if response.status_code in GATEWAY_ERROR_STATUSES:
+                    self.pool.record_failure(node)
                 return ProcessingResult(
                     contact=contact,
                     status="failed",
                     timestamp=datetime.now(),
                     error_message=f"HTTP {response.status_code}: {response.text}"
-                )
+                ), self.retry_policy.is_retryable_status(response.status_code)
                 
         except Exception as e:
+            observe_request(self.metrics, "sms_send", started, "error")
+            retryable = self._request_failed(node, e)
             return ProcessingResult(
                 contact=contact,
                 status="failed", 
                 timestamp=datetime.now(),
-                error_message=str(e)
-            )
+                error_message=request_error_message(e, retryable)
+            ), retryable
     
-    def send_batch_sms(self, contacts: List[Contact]) -> List[ProcessingResult]:
-        """Send batch SMS via Kotlin gateway"""
-        try:
-            payload = {
-                "contacts": [
-                    {
-                        "name": contact.name,
-                        "phone": contact.phone, 
-                        "message": contact.message
-                    }
-                    for contact in contacts
-                ]
-            }
+    def send_batch_sms(self, contacts: List[Contact],
+                       on_results: Optional[Callable[[List[ProcessingResult]], None]] = None) -> List[ProcessingResult]:
+        """
+        Send batch SMS via Kotlin gateway
+        With batch_size set, contacts are posted in chunks of batch_size and the
+        per-chunk results merged in input order, a failed chunk only fails its own contacts
+        With max_in_flight > 1, up to that many chunks are sent concurrently
+        on_results, if given, is called from the calling thread with each finished chunk
+        """
+        chunk_positions = self.pool.plan_chunks(contacts, self.batch_size)
+        chunks = [[contacts[position] for position in positions] for positions in chunk_positions]
+        
+        results = [None] * len(contacts)
+        if self.max_in_flight == 1 or len(chunks) == 1:
+            for positions, chunk in zip(chunk_positions, chunks):
+                self._collect(results, positions, self._send_batch_chunk(chunk), on_results)
+            return results
+        
+        # map() yields in submission order, so results line up with their chunks
+        with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(chunks))) as executor:
+            for positions, chunk_results in zip(chunk_positions, executor.map(self._send_batch_chunk, chunks)):
+                self._collect(results, positions, chunk_results, on_results)
+        return results
+    
+    def _collect(self, results: List[ProcessingResult], positions: List[int], chunk_results: List[ProcessingResult],
+                 on_results: Optional[Callable[[List[ProcessingResult]], None]]):
+        """Put a finished chunk back at its contacts' positions and hand it to the caller's callback"""
+        for position, result in zip(positions, chunk_results):
+            results[position] = result
+        if on_results is not None:
+            on_results(chunk_results)
+    
+    def _request_failed(self, node: GatewayNode, error: Exception) -> bool:
+        """
+        Update the pool after a request raised, returns whether to retry
+        A gateway that could not be reached is ejected and the request sent
+        again; after other request errors the SMS may be out, so no retry
+        """
+        if request_not_sent(error):
+            self.pool.eject(node)
+            return True
+        if isinstance(error, REQUEST_ERRORS):
+            self.pool.record_failure(node)
+        return False
+    
+    def _pace(self, node: GatewayNode, messages: int):
+        """Wait for the gateway's rate limiter to allow `messages` more sends"""
+        if node.rate_limiter is not None:
+            node.rate_limiter.acquire(messages)
+    
+    def _wait_outage(self, outage: OutageWait):
+        """Pause while every gateway is ejected, within the max_outage budget"""
+        waited = outage.wait()
+        if waited and self.metrics is not None:
+            self.metrics.add_time('outage_wait', waited)
+    
+    def _send_batch_chunk(self, contacts: List[Contact]) -> List[ProcessingResult]:
+        """
+        Send one chunk to /api/sms/batch
+        A chunk that never reached a gateway is resent, and with retry_failed_contacts
+        only the contacts the gateway reported as failed are resent. A chunk
+        that fails while every gateway is down is resent once one is back,
+        without counting the attempt (see max_outage)
+        """
+        results = [None] * len(contacts)
+        pending = list(range(len(contacts)))
+        outage = OutageWait(self.pool, self.max_outage)
+        attempt = 1
+        while True:
+            self._wait_outage(outage)
+            attempt_results, retryable = self._post_batch([contacts[i] for i in pending])
+            for i, result in zip(pending, attempt_results):
+                result.attempts = attempt
+                results[i] = result
+            if retryable and outage.ongoing():
+                continue
             
-            response = self.session.post(
-                f"{self.base_url}/api/sms/batch",
-                json=payload,
-                timeout=self.timeout * 2
-            )
+            if attempt >= self.retry_policy.max_attempts:
+                return results
+            retry_positions = self.retry_policy.contacts_to_retry(attempt_results, retryable)
+            if not retry_positions:
+                return results
+            
+            time.sleep(self.retry_policy.backoff(attempt))
+            pending = [pending[position] for position in retry_positions]
+            attempt += 1
+    
+    def _post_batch(self, contacts: List[Contact]) -> Tuple[List[ProcessingResult], Optional[bool]]:
+        """
+        One /api/sms/batch attempt, returns (results, retryable)
+        retryable is None when the gateway answered with per-contact results
+        """
+        node = self.pool.pick(contacts[0])
+        started = None
+        try:
+            with self.pool.lease(node):
+                self._pace(node, len(contacts))
+                started = time.perf_counter()
+                response = self.session.post(
+                    f"{node.url}/api/sms/batch",
+                    json=batch_payload(contacts),
+                    timeout=batch_timeout(self.timeout, self.batch_size, len(contacts))
+                )
+            observe_request(self.metrics, "sms_batch", started, response.status_code)
+            feed_rate_limiter(node.rate_limiter, response.status_code, response.headers)
             
             if response.status_code == 200:
-                results = []
-                response_data = response.json()
-                
-                for i, contact in enumerate(contacts):
-                    result_status = response_data.get('results', [{}] * len(contacts))[i]
-                    results.append(ProcessingResult(
-                        contact=contact,
-                        status=result_status.get('status', 'unknown'),
-                        timestamp=datetime.now(),
-                        error_message=result_status.get('error')
-                    ))
-                
-                return results
+                self.pool.record_success(node, len(contacts))
+                return batch_results(contacts, response.json()), None
             else:
-                return [
-                    ProcessingResult(
-                        contact=contact,
-                        status="failed",
-                        timestamp=datetime.now(),
-                        error_message=f"Batch failed: HTTP {response.status_code}"
-                    )
-                    for contact in contacts
-                ]
+                if response.status_code in GATEWAY_ERROR_STATUSES:
+                    self.pool.record_failure(node)
+                return (failed_results(contacts, f"Batch failed: HTTP {response.status_code}"),
+                        self.retry_policy.is_retryable_status(response.status_code))
                 
         except Exception as e:
-            return [
-                ProcessingResult(
-                    contact=contact,
-                    status="failed",
-                    timestamp=datetime.now(),
-                    error_message=str(e)
-                )
-                for contact in contacts
-            ]
\ No newline at end of file
+            observe_request(self.metrics, "sms_batch", started, "error")
+            retryable = self._request_failed(node, e)
+            return failed_results(contacts, request_error_message(e, retryable)), retryable
@@ -0,0 +1,279 @@
+import asyncio
+import aiohttp
+import time
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+from datetime import datetime
+
+from src.core.models import Contact, ProcessingResult
+from src.core.api_client import (
+    sms_payload, batch_payload, batch_timeout, batch_results, failed_results, feed_rate_limiter,
+    observe_request, request_error_message, GATEWAY_ERROR_STATUSES
+)
+from src.core.gateway_pool import GatewayPool, GatewayNode, OutageWait
+from src.core.rate_limiter import TokenBucket
+from src.core.retry import RetryPolicy
+from src.utils.metrics import BatchMetrics
+
+# No connection was made, so the gateway never saw the request: safe to send again
+NOT_SENT_ERRORS = (aiohttp.ClientConnectorError, ConnectionRefusedError)
+# Request errors that count against the gateway's circuit breaker; a timeout or
+# dropped connection may come after the SMS went out, so these are not retried
+REQUEST_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError)
+
+class AsyncKotlinGatewayClient:
+    """
+    asyncio counterpart of KotlinGatewayClient, same health_check/send_sms/send_batch_sms surface
+    One pooled keep-alive aiohttp session per client, so several gateways can be
+    driven from one event loop without a thread per connection
+    """
+    def __init__(self, base_url: Union[str, Sequence[str]] = "http://localhost:8080", timeout: int = 30,
+                 batch_size: Optional[int] = None, max_in_flight: int = 1, max_concurrent_sends: int = 100,
+                 rate_limiter: Optional[TokenBucket] = None, retry_policy: Optional[RetryPolicy] = None,
+                 routing: str = "round_robin", sticky_ddd: bool = False, pool: Optional[GatewayPool] = None,
+                 health_timeout: float = 5, max_outage: float = 0, failure_threshold: int = 3, eject_seconds: float = 30):
+        """
+        Pass `pool` to share gateway health, load and rate limiting with a
+        KotlinGatewayClient; otherwise one is built from base_url like there
+        """
+        self.pool = pool or GatewayPool(base_url, routing=routing, sticky_ddd=sticky_ddd, rate_limiter=rate_limiter,
+                                        eject_seconds=eject_seconds, failure_threshold=failure_threshold)
+        self.base_url = self.pool.nodes[0].url
+        self.timeout = timeout
+        self.health_timeout = health_timeout
+        self.max_outage = max_outage
+        self.batch_size = batch_size
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_concurrent_sends = max(1, max_concurrent_sends)
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=1)
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._send_slots: Optional[asyncio.Semaphore] = None
+        self._chunk_slots: Optional[asyncio.Semaphore] = None
+        self.metrics: Optional[BatchMetrics] = None
+    
+    async def __aenter__(self) -> "AsyncKotlinGatewayClient":
+        self._ensure_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        """Create the session lazily, it must be bound to the running event loop"""
+        if self.session is None or self.session.closed:
+            connections = max(self.max_concurrent_sends, self.max_in_flight)
+            connector = aiohttp.TCPConnector(
+                limit=connections * len(self.pool.nodes),
+                limit_per_host=connections,
+                keepalive_timeout=60
+            )
+            self.session = aiohttp.ClientSession(connector=connector)
+            self._send_slots = asyncio.Semaphore(self.max_concurrent_sends)
+            self._chunk_slots = asyncio.Semaphore(self.max_in_flight)
+        return self.session
+    
+    async def close(self):
+        """Close the pooled connections"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+    
+    async def health_check(self) -> bool:
+        """Probe every gateway, ejecting unhealthy ones; True if at least one is up"""
+        return any(await asyncio.gather(*(self._probe(node) for node in self.pool.nodes)))
+    
+    async def _probe(self, node: GatewayNode) -> bool:
+        """Health check a single gateway and update its pool state"""
+        try:
+            session = self._ensure_session()
+            async with session.get(f"{node.url}/health", timeout=aiohttp.ClientTimeout(total=self.health_timeout)) as response:
+                healthy = response.status == 200
+        except Exception:
+            healthy = False
+        if healthy:
+            self.pool.mark_up(node)
+        else:
+            self.pool.eject(node)
+        return healthy
+    
+    async def send_sms(self, contact: Contact) -> ProcessingResult:
+        """
+        Send single SMS via Kotlin gateway, at most max_concurrent_sends in flight
+        Transient failures are retried per the retry policy, full outages waited out like there
+        """
+        outage = OutageWait(self.pool, self.max_outage)
+        attempt = 1
+        while True:
+            result, retryable = await self._post_sms(contact, outage)
+            result.attempts = attempt
+            if retryable and outage.ongoing():
+                continue
+            if not retryable or attempt >= self.retry_policy.max_attempts:
+                return result
+            await asyncio.sleep(self.retry_policy.backoff(attempt))
+            attempt += 1
+    
+    async def _post_sms(self, contact: Contact, outage: OutageWait) -> Tuple[ProcessingResult, bool]:
+        """One /api/sms/send attempt, returns (result, worth retrying)"""
+        session = self._ensure_session()
+        async with self._send_slots:
+            await self._wait_outage(outage)
+            node = self.pool.pick(contact)
+            started = None
+            try:
+                with self.pool.lease(node):
+                    await self._pace(node, 1)
+                    started = time.perf_counter()
+                    async with session.post(
+                        f"{node.url}/api/sms/send",
+                        json=sms_payload(contact),
+                        timeout=aiohttp.ClientTimeout(total=self.timeout)
+                    ) as response:
+                        status = response.status
+                        headers = response.headers
+                        text = await response.text()
+                observe_request(self.metrics, "sms_send", started, status)
+                feed_rate_limiter(node.rate_limiter, status, headers)
+                if status == 200:
+                    self.pool.record_success(node, 1)
+                    return ProcessingResult(
+                        contact=contact,
+                        status="sent",
+                        timestamp=datetime.now()
+                    ), False
+                if status in GATEWAY_ERROR_STATUSES:
+                    self.pool.record_failure(node)
+                return ProcessingResult(
+                    contact=contact,
+                    status="failed",
+                    timestamp=datetime.now(),
+                    error_message=f"HTTP {status}: {text}"
+                ), self.retry_policy.is_retryable_status(status)
+                
+            except Exception as e:
+                observe_request(self.metrics, "sms_send", started, "error")
+                retryable = self._request_failed(node, e)
+                return ProcessingResult(
+                    contact=contact,
+                    status="failed",
+                    timestamp=datetime.now(),
+                    error_message=request_error_message(e, retryable)
+                ), retryable
+    
+    async def send_many_sms(self, contacts: List[Contact],
+                            on_results: Optional[Callable[[List[ProcessingResult]], None]] = None) -> List[ProcessingResult]:
+        """
+        Send each contact through /api/sms/send concurrently, results in input order
+        on_results, if given, is called with each result as soon as it is known
+        """
+        async def send(contact: Contact) -> ProcessingResult:
+            result = await self.send_sms(contact)
+            if on_results is not None:
+                on_results([result])
+            return result
+        
+        return list(await asyncio.gather(*(send(contact) for contact in contacts)))
+    
+    async def send_batch_sms(self, contacts: List[Contact],
+                             on_results: Optional[Callable[[List[ProcessingResult]], None]] = None) -> List[ProcessingResult]:
+        """
+        Send batch SMS via Kotlin gateway
+        Chunks of batch_size are posted with up to max_in_flight outstanding,
+        routed across the pool's gateways; results are merged in input order
+        on_results, if given, is called with each chunk as soon as it finishes
+        """
+        results = [None] * len(contacts)
+        
+        async def send(positions: List[int]):
+            chunk_results = await self._send_batch_chunk([contacts[position] for position in positions])
+            for position, result in zip(positions, chunk_results):
+                results[position] = result
+            if on_results is not None:
+                on_results(chunk_results)
+        
+        await asyncio.gather(*(send(positions) for positions in self.pool.plan_chunks(contacts, self.batch_size)))
+        return results
+    
+    def _request_failed(self, node: GatewayNode, error: Exception) -> bool:
+        """Update the pool after a request raised, returns whether to retry (see KotlinGatewayClient)"""
+        if isinstance(error, NOT_SENT_ERRORS):
+            self.pool.eject(node)
+            return True
+        if isinstance(error, REQUEST_ERRORS):
+            self.pool.record_failure(node)
+        return False
+    
+    async def _pace(self, node: GatewayNode, messages: int):
+        """Wait, without blocking the loop, for the gateway's rate limiter to allow `messages` more sends"""
+        if node.rate_limiter is not None:
+            await node.rate_limiter.acquire_async(messages)
+    
+    async def _wait_outage(self, outage: OutageWait):
+        """
+        Pause while every gateway is ejected, within the max_outage budget
+        Called holding a send slot: requests queued behind it check again once
+        they get theirs, instead of all being sent into the outage
+        """
+        waited = await outage.wait_async()
+        if waited and self.metrics is not None:
+            self.metrics.add_time('outage_wait', waited)
+    
+    async def _send_batch_chunk(self, contacts: List[Contact]) -> List[ProcessingResult]:
+        """
+        Send one chunk to /api/sms/batch, retrying like KotlinGatewayClient:
+        the whole chunk when it never reached a gateway, otherwise only failed contacts
+        """
+        results = [None] * len(contacts)
+        pending = list(range(len(contacts)))
+        outage = OutageWait(self.pool, self.max_outage)
+        attempt = 1
+        while True:
+            attempt_results, retryable = await self._post_batch([contacts[i] for i in pending], outage)
+            for i, result in zip(pending, attempt_results):
+                result.attempts = attempt
+                results[i] = result
+            if retryable and outage.ongoing():
+                continue
+            
+            if attempt >= self.retry_policy.max_attempts:
+                return results
+            retry_positions = self.retry_policy.contacts_to_retry(attempt_results, retryable)
+            if not retry_positions:
+                return results
+            
+            await asyncio.sleep(self.retry_policy.backoff(attempt))
+            pending = [pending[position] for position in retry_positions]
+            attempt += 1
+    
+    async def _post_batch(self, contacts: List[Contact], outage: OutageWait) -> Tuple[List[ProcessingResult], Optional[bool]]:
+        """One /api/sms/batch attempt, returns (results, retryable)"""
+        session = self._ensure_session()
+        async with self._chunk_slots:
+            await self._wait_outage(outage)
+            node = self.pool.pick(contacts[0])
+            started = None
+            try:
+                with self.pool.lease(node):
+                    await self._pace(node, len(contacts))
+                    started = time.perf_counter()
+                    async with session.post(
+                        f"{node.url}/api/sms/batch",
+                        json=batch_payload(contacts),
+                        timeout=aiohttp.ClientTimeout(total=batch_timeout(self.timeout, self.batch_size, len(contacts)))
+                    ) as response:
+                        status = response.status
+                        headers = response.headers
+                        data = await response.json() if status == 200 else None
+                observe_request(self.metrics, "sms_batch", started, status)
+                feed_rate_limiter(node.rate_limiter, status, headers)
+                if status == 200:
+                    self.pool.record_success(node, len(contacts))
+                    return batch_results(contacts, data), None
+                if status in GATEWAY_ERROR_STATUSES:
+                    self.pool.record_failure(node)
+                return (failed_results(contacts, f"Batch failed: HTTP {status}"),
+                        self.retry_policy.is_retryable_status(status))
+                
+            except Exception as e:
+                observe_request(self.metrics, "sms_batch", started, "error")
+                retryable = self._request_failed(node, e)
+                return failed_results(contacts, request_error_message(e, retryable)), retryable
@@ -0,0 +1,72 @@
+import threading
+import time
+
+class CircuitBreaker:
+    """
+    Per-gateway circuit breaker
+    closed: requests flow; failure_threshold consecutive failures (or trip())
+    open it. open: no requests until reset_timeout has passed, then it is
+    half_open and requests go through as trials; a success closes it again,
+    a failure re-opens it for another reset_timeout
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+    
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+    
+    def allows_requests(self) -> bool:
+        return self.state != self.OPEN
+    
+    def retry_in(self) -> float:
+        """Seconds until an open breaker turns half-open, 0 when it isn't open"""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+    
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self._opened_at = None
+    
+    def record_failure(self) -> bool:
+        """Count a failure, True if it opened the breaker"""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self._opened_at is not None:
+                # A failed half-open trial, or a late failure of a request sent before opening
+                self._opened_at = time.monotonic()
+                return False
+            if self.consecutive_failures >= self.failure_threshold:
+                self._open()
+                return True
+            return False
+    
+    def trip(self) -> bool:
+        """Open now (unreachable gateway, failed health check), True if it was not open already"""
+        with self._lock:
+            self.consecutive_failures += 1
+            was_closed = self._opened_at is None
+            if was_closed:
+                self._open()
+            else:
+                self._opened_at = time.monotonic()
+            return was_closed
+    
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.models import Contact, ProcessingResult
+
+class ContactDeduplicator:
+    """
+    Skips contacts that would repeat an SMS, keyed on normalized phone, name and message
+    (phone and name with key_field 'name'). The name is always part of the key:
+    relay numbers (tel.recado) are often shared by a family, and sheets
+    without a message column give every row the same default text
+    Within a run a hash set catches repeats across rows and chunks. With an
+    index_file, keys of sent contacts are kept on disk for ttl_hours, so the
+    same patient isn't messaged again by the next day's export
+    Keys are stored hashed, the index holds no phone numbers or names
+    """
+    def __init__(self, key_field: str = "message", index_file: Optional[str] = None, ttl_hours: float = 24):
+        if key_field not in ("message", "name"):
+            raise ValueError(f"Unsupported deduplication key: {key_field}")
+        self.key_field = key_field
+        self._key_fields = ("name",) if key_field == "name" else ("name", "message")
+        self._key_label = "phone and name" if key_field == "name" else "phone, name and message"
+        self.index_file = index_file
+        self.ttl_seconds = ttl_hours * 3600
+        self._seen: Dict[str, str] = {}
+        self._sent_index: Dict[str, float] = self._load_index()
+        self._dirty = False
+    
+    @classmethod
+    def from_dict(cls, settings: Optional[Dict[str, Any]]) -> Optional["ContactDeduplicator"]:
+        """Build from the `deduplication` config section, None when disabled"""
+        settings = settings or {}
+        if not settings.get('enabled', False):
+            return None
+        return cls(
+            key_field=settings.get('key', 'message'),
+            index_file=settings.get('index_file') or None,  # cross-run index is opt-in
+            ttl_hours=settings.get('ttl_hours', 24)
+        )
+    
+    def start_run(self):
+        """Forget in-run keys, the persistent index is kept"""
+        self._seen = {}
+    
+    def remember(self, contacts: List[Contact]):
+        """Count contacts sent earlier in this batch (before a resume) as seen, so their repeats are still skipped"""
+        for contact in contacts:
+            self._seen.setdefault(self.contact_key(contact), row_label(contact))
+    
+    def contact_key(self, contact: Contact) -> str:
+        """Hash of the phone digits and the case/whitespace-normalized key fields"""
+        digits = re.sub(r'\D', '', contact.phone)
+        texts = [' '.join((getattr(contact, field) or '').split()).casefold() for field in self._key_fields]
+        return hashlib.sha1('|'.join([digits, *texts]).encode('utf-8')).hexdigest()
+    
+    def filter(self, contacts: List[Contact]) -> Tuple[List[Contact], List[Dict]]:
+        """
+        Split contacts into (unique, skip_entries)
+        Every skipped row gets its own entry, shaped like a validation error
+        """
+        unique = []
+        skipped = []
+        for contact in contacts:
+            key = self.contact_key(contact)
+            first_row = self._seen.get(key)
+            if first_row is not None:
+                skipped.append(self._skip_entry(contact, f"Duplicate of {first_row} (same {self._key_label}), skipped"))
+            elif self._sent_recently(key):
+                skipped.append(self._skip_entry(contact, f"Same {self._key_label} already sent within the last {self.ttl_seconds / 3600:g}h, skipped"))
+            else:
+                self._seen[key] = row_label(contact)
+                unique.append(contact)
+        return unique, skipped
+    
+    def _sent_recently(self, key: str) -> bool:
+        """Key is in the index and younger than the TTL; an expired key is dropped, a --watch process never reloads it"""
+        sent_at = self._sent_index.get(key)
+        if sent_at is None:
+            return False
+        if time.time() - sent_at < self.ttl_seconds:
+            return True
+        del self._sent_index[key]
+        self._dirty = True
+        return False
+    
+    def _skip_entry(self, contact: Contact, reason: str) -> Dict:
+        entry = {
+            'row_index': contact.row_index,
+            'name': contact.name,
+            'phone_attempted': contact.phone,
+            'error': reason,
+            'type': 'duplicate'
+        }
+        if contact.source_file is not None:
+            entry['file'] = contact.source_file
+        return entry
+    
+    def mark_sent(self, results: List[ProcessingResult]):
+        """Remember successfully sent contacts in the persistent index"""
+        if self.index_file is None:
+            return
+        now = time.time()
+        for result in results:
+            if result.status == "sent":
+                self._sent_index[self.contact_key(result.contact)] = now
+                self._dirty = True
+    
+    def _load_index(self) -> Dict[str, float]:
+        """Read the on-disk index, dropping entries older than the TTL"""
+        if self.index_file is None or not os.path.exists(self.index_file):
+            return {}
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        cutoff = time.time() - self.ttl_seconds
+        return {key: sent_at for key, sent_at in entries.items() if sent_at >= cutoff}
+    
+    def save(self):
+        """Write the persistent index atomically, if anything changed"""
+        if self.index_file is None or not self._dirty:
+            return
+        directory = os.path.dirname(os.path.abspath(self.index_file))
+        os.makedirs(directory, exist_ok=True)
+        cutoff = time.time() - self.ttl_seconds
+        entries = {key: sent_at for key, sent_at in self._sent_index.items() if sent_at >= cutoff}
+        temp_path = f"{self.index_file}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+        os.replace(temp_path, self.index_file)
+        self._dirty = False
+
+def row_label(contact: Contact) -> str:
+    """'row 12', or 'clinic_a.xlsx row 12' for contacts of a multi-file batch"""
+    if contact.source_file is None:
+        return f"row {contact.row_index}"
+    return f"{os.path.basename(contact.source_file)} row {contact.row_index}"
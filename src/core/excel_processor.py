@@ -1,156 +1,293 @@
+import os
 import pandas as pd
-from typing import List, Tuple, Dict
+from contextlib import nullcontext
+from typing import List, Tuple, Dict, Iterator, Optional, Sequence
 from src.core.models import Contact
+from src.core.parse_cache import ParseCache
+from src.core.readers import get_reader
+from src.core.phone import normalize_phone, phone_error
+from src.utils.metrics import BatchMetrics
+
+# Bump whenever validation or normalization changes what a file parses to,
+# so parse cache entries built by older rules are not reused
+VALIDATION_RULES_VERSION = 4
+
+def cell_text(value) -> str:
+    """str() of a cell, 99998888.0 as '99998888'"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
 
 class ExcelProcessor:
-    def __init__(self):
+    def __init__(self, cache: Optional[ParseCache] = None, extra_columns: Sequence[str] = ()):
         self.required_columns = ['paciente']
         self.phone_columns = ['tel.recado', 'tel.celular']
+        self.optional_columns = ['message', 'message_type']
+        # Kept as text in Contact.attributes, for the send scheduler's rules
+        self.extra_columns = [col for col in extra_columns if col not in self.required_columns + self.phone_columns + self.optional_columns]
+        self.cache = cache
+        # Set per batch by BatchProcessor; times the 'read' and 'validate' stages
+        self.metrics: Optional[BatchMetrics] = None
         
+    @property
+    def input_columns(self) -> List[str]:
+        """Columns validation reads, columnar readers load only these"""
+        return self.required_columns + self.phone_columns + self.optional_columns + self.extra_columns
+    
+    @property
+    def rules_fingerprint(self) -> str:
+        """Identifies the rules a parse result depends on, part of the parse cache key"""
+        return f"v{VALIDATION_RULES_VERSION}|{','.join(self.input_columns)}"
+    
     def load_contacts_from_excel(self, file_path: str) -> Tuple[List[Contact], List[Dict]]:
         """
-        Load contacts from Excel file
+        Load contacts from Excel file, or CSV/Parquet/JSONL (see src.core.readers)
         - REQUIRES 'paciente' column to exist in the file
         - Skips individual rows with missing/invalid data
+        - With a cache, an unchanged file is not parsed again
         
         Returns:
             Tuple of (valid_contacts, error_entries)
         """
         try:
-            df = pd.read_excel(file_path)
-            
-            missing_columns = [col for col in self.required_columns if col not in df.columns]
-            if missing_columns:
-                raise ValueError(f"Missing required column: 'paciente'. File must have a 'paciente' column.")
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.key(file_path, self.rules_fingerprint)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    self._count('rows_cached', len(cached[0]) + len(cached[1]))
+                    return cached
             
-            available_phone_columns = [col for col in self.phone_columns if col in df.columns]
-            if not available_phone_columns:
-                print(f"⚠️  Warning: No phone columns found. Looking for: {self.phone_columns}")
+            with self._stage('read'):
+                df = get_reader(file_path).read(file_path, self.input_columns)
+            available_phone_columns = self._check_columns(df.columns)
+            with self._stage('validate'):
+                valid_contacts, error_entries = self._process_dataframe(df, available_phone_columns)
+            self._count('rows_parsed', len(df))
             
-            valid_contacts = []
-            error_entries = []
+            if cache_key is not None:
+                self._store(cache_key, valid_contacts, error_entries)
+            return valid_contacts, error_entries
             
-            for index, row in df.iterrows():
-                try:
-                    contact, error = self._process_single_row(row, index, available_phone_columns)
-                    
-                    if error:
-                        error_entries.append(error)
-                    else:
-                        valid_contacts.append(contact)
-                        
-                except Exception as e:
-                    error_entries.append({
-                        'row_index': index + 2,
-                        'name': 'Unknown',
-                        'phone_attempted': 'Unknown',
-                        'error': f"Unexpected error: {str(e)}"
-                    })
-                    continue
+        except Exception as e:
+            raise Exception(f"{self._kind(file_path)} processing failed: {str(e)}")
+    
+    def stream_contacts_from_excel(self, file_path: str, chunk_size: int = 1000) -> Iterator[Tuple[List[Contact], List[Dict]]]:
+        """
+        Stream contacts from Excel file (or CSV/Parquet/JSONL) in chunks of at most chunk_size rows
+        - .xlsx files are read row by row with openpyxl in read-only mode,
+          so memory stays bounded by the chunk size, not the file size
+        - .xls files can't be streamed and are read whole, then chunked
+        - CSV is read in chunks, Parquet by record batch, JSONL line by line
+        
+        - A file found in the cache is handed out from there, without parsing;
+          streamed parses are not cached, that would hold the whole file in memory
+        
+        Yields:
+            Tuple of (valid_contacts, error_entries) for each chunk, with
+            the same contacts and row-indexed errors as load_contacts_from_excel
+        """
+        try:
+            if self.cache is not None:
+                cached = self.cache.get(self.cache.key(file_path, self.rules_fingerprint))
+                if cached is not None:
+                    self._count('rows_cached', len(cached[0]) + len(cached[1]))
+                    yield from self._cached_chunks(*cached, chunk_size)
+                    return
             
-            return valid_contacts, error_entries
+            chunks = iter(get_reader(file_path).iter_chunks(file_path, self.input_columns, chunk_size))
             
+            available_phone_columns = None
+            while True:
+                with self._stage('read'):
+                    df = next(chunks, None)
+                if df is None:
+                    break
+                if available_phone_columns is None:
+                    available_phone_columns = self._check_columns(df.columns)
+                with self._stage('validate'):
+                    result = self._process_dataframe(df, available_phone_columns)
+                self._count('rows_parsed', len(df))
+                yield result
+                
         except Exception as e:
-            raise Exception(f"Excel processing failed: {str(e)}")
+            raise Exception(f"{self._kind(file_path)} processing failed: {str(e)}")
+    
+    def _stage(self, name: str):
+        return self.metrics.stage(name) if self.metrics is not None else nullcontext()
+    
+    def _count(self, name: str, amount: int):
+        if self.metrics is not None:
+            self.metrics.count(name, amount)
     
-    def _process_single_row(self, row, row_index: int, available_phone_columns: List[str]) -> Tuple[Contact, Dict]:
+    def _store(self, cache_key: str, valid_contacts: List[Contact], error_entries: List[Dict]):
+        """Cache a parse result, a cache that can't be written only costs the next run a parse"""
+        try:
+            self.cache.put(cache_key, valid_contacts, error_entries)
+        except OSError as e:
+            print(f"⚠️  Warning: Could not write parse cache: {e}")
+    
+    def _cached_chunks(self, valid_contacts: List[Contact], error_entries: List[Dict],
+                       chunk_size: int) -> Iterator[Tuple[List[Contact], List[Dict]]]:
+        """Split a cached result into chunks of at most chunk_size rows, like the streamed parse"""
+        rows = sorted({contact.row_index for contact in valid_contacts} | {error['row_index'] for error in error_entries})
+        if not rows:
+            yield [], []
+            return
+        contacts_iter = iter(valid_contacts)
+        errors_iter = iter(error_entries)
+        next_contact = next(contacts_iter, None)
+        next_error = next(errors_iter, None)
+        for start in range(0, len(rows), chunk_size):
+            last_row = rows[min(start + chunk_size, len(rows)) - 1]
+            chunk_contacts, chunk_errors = [], []
+            while next_contact is not None and next_contact.row_index <= last_row:
+                chunk_contacts.append(next_contact)
+                next_contact = next(contacts_iter, None)
+            while next_error is not None and next_error['row_index'] <= last_row:
+                chunk_errors.append(next_error)
+                next_error = next(errors_iter, None)
+            yield chunk_contacts, chunk_errors
+    
+    def _kind(self, file_path: str) -> str:
+        """'Excel', 'CSV', ... for error messages"""
+        extension = os.path.splitext(file_path)[1].lower()
+        return {'.xlsx': 'Excel', '.xls': 'Excel', '.csv': 'CSV', '.parquet': 'Parquet', '.pq': 'Parquet',
+                '.jsonl': 'JSONL', '.ndjson': 'JSONL'}.get(extension, 'Input')
+    
+    def _check_columns(self, columns) -> List[str]:
+        """Ensure required columns exist and return the phone columns present"""
+        missing_columns = [col for col in self.required_columns if col not in columns]
+        if missing_columns:
+            raise ValueError(f"Missing required column: 'paciente'. File must have a 'paciente' column.")
+        
+        available_phone_columns = [col for col in self.phone_columns if col in columns]
+        if not available_phone_columns:
+            print(f"⚠️  Warning: No phone columns found. Looking for: {self.phone_columns}")
+        return available_phone_columns
+    
+    def _process_dataframe(self, df: pd.DataFrame, available_phone_columns: List[str]) -> Tuple[List[Contact], List[Dict]]:
         """
-        Process a single row, return (Contact, error_dict)
-        If Contact is None, the error_dict contains the error details
+        Turn a frame of rows into (valid_contacts, error_entries), index is the data row number
+        Validation runs column-wise with string ops and boolean masks, only the
+        resulting contacts and error entries are built row by row
         """
-        if pd.isna(row['paciente']) or not str(row['paciente']).strip() or str(row['paciente']).strip() == 'nan':
-            return None, {
-                'row_index': row_index + 2,
-                'name': 'Missing',
-                'phone_attempted': self._get_phone_attempt(row),
-                'error': "Empty or missing patient name in 'paciente' column"
-            }
+        names = self._as_text(df['paciente'])
+        name_missing = df['paciente'].isna() | names.isin(['', 'nan'])
+        
+        # Stripped text per phone column, NaN where the cell holds no phone
+        phone_texts = {}
+        for col in self.phone_columns:
+            if col in df.columns:
+                texts = self._as_text(df[col])
+                phone_texts[col] = texts.where(df[col].notna() & ~texts.isin(['', 'nan']))
+        
+        phones = pd.Series(None, index=df.index, dtype=object)
+        for col in self.phone_columns:
+            if col in available_phone_columns:
+                normalized = self._normalize_phones(phone_texts[col])
+                phones = phones.where(phones.notna(), normalized)
         
-        name = str(row['paciente']).strip()
+        if 'message' in df.columns:
+            messages = self._as_text(df['message']).tolist()
+        else:
+            messages = ['Hello from automated system'] * len(df)
         
-        phone, phone_error = self._get_phone_number_with_fallback(row, available_phone_columns)
+        if 'message_type' in df.columns:
+            message_types = self._as_text(df['message_type']).str.upper().tolist()
+        else:
+            message_types = ['SMS'] * len(df)
         
-        if phone_error:
-            return None, {
-                'row_index': row_index + 2,
-                'name': name,
-                'phone_attempted': self._get_phone_attempt(row),
-                'error': phone_error
-            }
+        ok = (~name_missing & phones.notna()).tolist()
+        valid_contacts = [
+            Contact(name=name, phone=phone, message=message, message_type=message_type, row_index=index + 2)
+            for index, name, phone, message, message_type, keep
+            in zip(df.index.tolist(), names.tolist(), phones.tolist(), messages, message_types, ok)
+            if keep
+        ]
+        if self.extra_columns:
+            self._attach_attributes(df, ok, valid_contacts)
         
-        contact = Contact(
-            name=name,
-            phone=phone,
-            message=str(row.get('message', 'Hello from automated system')).strip(),
-            message_type=str(row.get('message_type', 'SMS')).upper()
-        )
+        error_entries = []
+        phone_error = f"No valid phone number found. Available columns: {available_phone_columns}"
+        attempts = self._phone_attempts(phone_texts, len(df))
+        for index, name, missing, keep, attempted in zip(
+            df.index.tolist(), names.tolist(), name_missing.tolist(), ok, attempts
+        ):
+            if keep:
+                continue
+            if missing:
+                error_entries.append({
+                    'row_index': index + 2,
+                    'name': 'Missing',
+                    'phone_attempted': attempted,
+                    'error': "Empty or missing patient name in 'paciente' column"
+                })
+            else:
+                error_entries.append({
+                    'row_index': index + 2,
+                    'name': name,
+                    'phone_attempted': attempted,
+                    'error': phone_error
+                })
         
-        return contact, None
+        return valid_contacts, error_entries
+    
+    def _attach_attributes(self, df: pd.DataFrame, ok: List[bool], valid_contacts: List[Contact]):
+        """Set Contact.attributes from the extra columns, '' for blank cells or columns the file lacks"""
+        values = {}
+        for col in self.extra_columns:
+            if col in df.columns:
+                texts = self._as_text(df[col]).where(df[col].notna(), '')
+                values[col] = [text for text, keep in zip(texts.replace('nan', '').tolist(), ok) if keep]
+            else:
+                values[col] = [''] * len(valid_contacts)
+        for contact, row in zip(valid_contacts, zip(*values.values())):
+            contact.attributes = dict(zip(values, row))
     
-    def _get_phone_number_with_fallback(self, row, available_phone_columns: List[str]) -> Tuple[str, str]:
+    def _as_text(self, column: pd.Series) -> pd.Series:
         """
-        Get phone number with fallback logic and validation
-        Only tries the phone columns that actually exist in the Excel file
+        Stripped str() of every cell, 'nan' for missing ones as str(NaN) gives
+        Integral floats print without '.0': pd.read_excel keeps a numeric column
+        with a blank as float64 while the streamed reader has ints, and both
+        must parse alike
         """
-        for phone_column in ['tel.recado', 'tel.celular']:
-            if phone_column in available_phone_columns and phone_column in row and pd.notna(row[phone_column]):
-                phone_str = str(row[phone_column]).strip()
-                
-                if not phone_str or phone_str == 'nan':
-                    continue
-                
-                validation_error = self.validate_phone_format(phone_str)
-                if validation_error:
-                    continue
-                else:
-                    return phone_str, None
+        return column.astype(object).map(cell_text).str.strip()
+    
+    def _normalize_phones(self, phones: pd.Series) -> pd.Series:
+        """
+        Canonical phone per cell, NaN where the cell holds no valid phone
+        Each distinct number is parsed once per column (and memoized across
+        columns and files), then mapped back onto the rows
+        """
+        present = phones.dropna()
+        table = {text: normalize_phone(text) for text in present.unique()}
+        return present.map(table).reindex(phones.index)
+    
+    def _phone_attempts(self, phone_texts: Dict[str, pd.Series], row_count: int) -> List[str]:
+        """String representation of phone attempts per row for error reporting"""
+        labelled = [
+            (f"{col}: '" + texts + "'").tolist()
+            for col, texts in phone_texts.items()
+        ]
+        if not labelled:
+            return ['No phone data'] * row_count
         
-        attempted_phones = self._get_phone_attempt(row)
-        return None, f"No valid phone number found. Available columns: {available_phone_columns}"
+        attempts = []
+        for row in zip(*labelled):
+            present = [attempt for attempt in row if isinstance(attempt, str)]
+            attempts.append(', '.join(present) if present else 'No phone data')
+        return attempts
     
     def validate_phone_format(self, phone: str) -> str:
         """
-        Validate Brazilian phone format: '11 - 9999 - 9999'
+        Validate Brazilian phone format: '11 - 9999 - 9999', 11-digit mobiles
+        and E.164 are accepted too (see src.core.phone)
         
         Returns:
             str: Error message if invalid, None if valid
         """
-        import re
-        
-        cleaned = re.sub(r'\s+', ' ', phone.strip())
-        
-        pattern = r'^\d{2}\s-\s\d{4}\s-\s\d{4}$'
-        if not re.match(pattern, cleaned):
-            return f"Invalid format. Expected 'XX - XXXX - XXXX', got '{phone}'"
-        
-        digits_only = re.sub(r'\D', '', phone)
-        if len(digits_only) != 10:
-            return f"Should have exactly 10 digits, got {len(digits_only)}"
-        
-        ddd = digits_only[:2]
-        valid_ddds = ['11', '12', '13', '14', '15', '16', '17', '18', '19', 
-                     '21', '22', '24', '27', '28', '31', '32', '33', '34', 
-                     '35', '37', '38', '41', '42', '43', '44', '45', '46', 
-                     '47', '48', '49', '51', '53', '54', '55', '61', '62', 
-                     '63', '64', '65', '66', '67', '68', '69', '71', '73', 
-                     '74', '75', '77', '79', '81', '82', '83', '84', '85', 
-                     '86', '87', '88', '89', '91', '92', '93', '94', '95', 
-                     '96', '97', '98', '99']
-        
-        if ddd not in valid_ddds:
-            return f"Invalid DDD: {ddd}"
-        
-        return None
-    
-    def _get_phone_attempt(self, row) -> str:
-        """Get string representation of phone attempts for error reporting"""
-        attempts = []
-        for col in ['tel.recado', 'tel.celular']:
-            if col in row and pd.notna(row[col]):
-                phone_str = str(row[col]).strip()
-                if phone_str and phone_str != 'nan':
-                    attempts.append(f"{col}: '{phone_str}'")
-        return ', '.join(attempts) if attempts else 'No phone data'
+        return phone_error(phone)
     
     def validate_contacts(self, contacts: List[Contact]) -> List[Contact]:
         """Final validation - should not have any phone errors at this point"""
@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+import itertools
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from src.core.circuit_breaker import CircuitBreaker
+from src.core.models import Contact
+from src.core.rate_limiter import TokenBucket
+
+ROUTING_STRATEGIES = ("round_robin", "least_outstanding")
+
+class GatewayNode:
+    """One Android device running the Kotlin gateway"""
+    def __init__(self, url: str, rate_limiter: Optional[TokenBucket] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.url = url.rstrip('/')
+        self.rate_limiter = rate_limiter
+        self.breaker = breaker or CircuitBreaker()
+        self.outstanding = 0
+        self.sent = 0
+    
+    @property
+    def healthy(self) -> bool:
+        return self.breaker.state == CircuitBreaker.CLOSED
+    
+    @property
+    def failures(self) -> int:
+        """Times the node was taken out of rotation"""
+        return self.breaker.times_opened
+    
+    def __repr__(self) -> str:
+        return f"GatewayNode({self.url!r}, healthy={self.healthy}, outstanding={self.outstanding})"
+
+class GatewayPool:
+    """
+    Routes sends across several gateways
+    round_robin spreads requests evenly, least_outstanding sends to the node
+    with the fewest requests in flight. With sticky_ddd, contacts of one DDD
+    always go to the same node (rendezvous hashing), keeping carrier locality
+    and moving only that node's DDDs when it is ejected.
+    Each node has a circuit breaker: a connection failure or a failed health
+    check ejects it at once, failure_threshold gateway errors (5xx) in a row
+    do too. An ejected node gets trial requests again after eject_seconds (or
+    as soon as a health check passes), meanwhile its traffic spreads over the
+    remaining nodes. When every node is out, wait_available() lets callers
+    pause until one is back
+    """
+    def __init__(self, urls: Union[str, Sequence[str]], routing: str = "round_robin", sticky_ddd: bool = False,
+                 rate_limiter: Optional[TokenBucket] = None, eject_seconds: float = 30.0, failure_threshold: int = 3):
+        if isinstance(urls, str):
+            urls = [urls]
+        if not urls:
+            raise ValueError("At least one gateway URL is required")
+        if routing not in ROUTING_STRATEGIES:
+            raise ValueError(f"Unknown routing strategy '{routing}', expected one of {ROUTING_STRATEGIES}")
+        
+        # The first node uses the given bucket, the others identical fresh ones
+        self.nodes = [
+            GatewayNode(url, rate_limiter if i == 0 or rate_limiter is None else rate_limiter.clone(),
+                        CircuitBreaker(failure_threshold, eject_seconds))
+            for i, url in enumerate(urls)
+        ]
+        self.routing = routing
+        self.sticky_ddd = sticky_ddd
+        self.eject_seconds = eject_seconds
+        self._round_robin = itertools.count()
+        self._lock = threading.Lock()
+        self._node_up = threading.Condition()
+    
+    def available_nodes(self) -> List[GatewayNode]:
+        """Nodes whose breaker lets requests through (closed or half-open); all nodes if none qualify"""
+        nodes = [node for node in self.nodes if node.breaker.allows_requests()]
+        return nodes or list(self.nodes)
+    
+    def has_available(self) -> bool:
+        """False while every node's breaker is open"""
+        return any(node.breaker.allows_requests() for node in self.nodes)
+    
+    def _next_trial_in(self) -> float:
+        return min(node.breaker.retry_in() for node in self.nodes)
+    
+    def wait_available(self, timeout: float) -> bool:
+        """Block until some node takes requests again, at most timeout seconds; True if one does"""
+        deadline = time.monotonic() + timeout
+        with self._node_up:
+            while not self.has_available():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                # Woken by mark_up, or when the first breaker turns half-open by itself
+                self._node_up.wait(min(remaining, self._next_trial_in()))
+        return True
+    
+    async def wait_available_async(self, timeout: float, poll_interval: float = 0.1) -> bool:
+        """wait_available without blocking the event loop"""
+        deadline = time.monotonic() + timeout
+        while not self.has_available():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(remaining, poll_interval, self._next_trial_in()))
+        return True
+    
+    def pick(self, contact: Optional[Contact] = None) -> GatewayNode:
+        """
+        Node for the next request, `contact` is used for DDD stickiness
+        The request counts as outstanding on the node from here, under the same
+        lock, so concurrent least_outstanding picks see it; pass the node to
+        lease() to release it once the request is done
+        """
+        nodes = self.available_nodes()
+        with self._lock:
+            if len(nodes) == 1:
+                node = nodes[0]
+            elif self.sticky_ddd and contact is not None:
+                node = self._rendezvous(ddd_of(contact), nodes)
+            elif self.routing == "least_outstanding":
+                node = min(nodes, key=lambda node: node.outstanding)
+            else:
+                node = nodes[next(self._round_robin) % len(nodes)]
+            node.outstanding += 1
+        return node
+    
+    def _rendezvous(self, ddd: str, nodes: List[GatewayNode]) -> GatewayNode:
+        return max(nodes, key=lambda node: hashlib.md5(f"{ddd}|{node.url}".encode()).digest())
+    
+    def plan_chunks(self, contacts: List[Contact], batch_size: Optional[int]) -> List[List[int]]:
+        """
+        Positions of contacts per batch request
+        With sticky_ddd, contacts are first grouped by the node their DDD maps
+        to, so every chunk can go to a single node; chunks are then ordered by
+        their first contact, so contacts put first (see SendScheduler) still go first
+        """
+        if self.sticky_ddd and len(self.nodes) > 1:
+            nodes = self.available_nodes()
+            groups: Dict[str, List[int]] = {}
+            for position, contact in enumerate(contacts):
+                groups.setdefault(self._rendezvous(ddd_of(contact), nodes).url, []).append(position)
+            position_groups = list(groups.values())
+        else:
+            position_groups = [list(range(len(contacts)))]
+        
+        chunks = []
+        for positions in position_groups:
+            if not batch_size:
+                chunks.append(positions)
+            else:
+                chunks.extend(positions[start:start + batch_size] for start in range(0, len(positions), batch_size))
+        if len(position_groups) > 1:
+            chunks.sort(key=lambda chunk: chunk[0])
+        return chunks
+    
+    @contextmanager
+    def lease(self, node: GatewayNode) -> Iterator[GatewayNode]:
+        """Hold the request pick() counted on the node while it runs, release it when done"""
+        try:
+            yield node
+        finally:
+            with self._lock:
+                node.outstanding -= 1
+    
+    def mark_up(self, node: GatewayNode):
+        """Put the node back into rotation, waking callers paused in wait_available"""
+        node.breaker.record_success()
+        with self._node_up:
+            self._node_up.notify_all()
+    
+    def eject(self, node: GatewayNode):
+        """Take the node out of rotation for eject_seconds"""
+        node.breaker.trip()
+    
+    def record_failure(self, node: GatewayNode):
+        """A gateway error response, ejects the node after failure_threshold in a row"""
+        node.breaker.record_failure()
+    
+    def record_success(self, node: GatewayNode, messages: int):
+        """Count delivered messages, a node that answers is healthy again"""
+        node.sent += messages
+        if node.breaker.consecutive_failures or not node.healthy:
+            self.mark_up(node)
+    
+    def rate_limiters(self) -> List[Tuple[str, TokenBucket]]:
+        """(url, bucket) for every node that is rate limited"""
+        return [(node.url, node.rate_limiter) for node in self.nodes if node.rate_limiter is not None]
+
+class OutageWait:
+    """
+    How long one request may wait out a full outage (every node ejected)
+    Create one per chunk or contact; the max_wait budget starts at the first
+    outage it sees and is shared by all later ones
+    """
+    def __init__(self, pool: GatewayPool, max_wait: float):
+        self.pool = pool
+        self.max_wait = max_wait
+        self.started: Optional[float] = None
+    
+    def ongoing(self) -> bool:
+        """Every node is out and there is budget left to wait"""
+        if not self.max_wait or self.pool.has_available():
+            return False
+        if self.started is None:
+            self.started = time.monotonic()
+        return self.remaining() > 0
+    
+    def remaining(self) -> float:
+        return self.started + self.max_wait - time.monotonic() if self.started is not None else self.max_wait
+    
+    def wait(self) -> float:
+        """Pause while the outage lasts (within budget), returns the seconds waited"""
+        if not self.ongoing():
+            return 0.0
+        start = time.monotonic()
+        self.pool.wait_available(self.remaining())
+        return time.monotonic() - start
+    
+    async def wait_async(self) -> float:
+        if not self.ongoing():
+            return 0.0
+        start = time.monotonic()
+        await self.pool.wait_available_async(self.remaining())
+        return time.monotonic() - start
+
+def ddd_of(contact: Contact) -> str:
+    """Area code of a contact's phone: its first two digits"""
+    return re.sub(r'\D', '', contact.phone)[:2]
@@ -0,0 +1,94 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from src.core.gateway_pool import GatewayPool
+
+class GatewayUnavailableError(Exception):
+    """No gateway answered its health check, nothing of the batch was sent"""
+
+class HealthMonitor:
+    """
+    Gateway health checked in the background instead of before every batch
+    While started, a daemon thread probes every `interval` seconds, and every
+    `recovery_interval` seconds while a gateway is down; the probe (the
+    client's health_check) ejects failing gateways and puts recovered ones
+    back, which wakes sends paused on an outage. is_healthy() reuses the last
+    result while it is younger than ttl seconds
+    """
+    def __init__(self, probe: Callable[[], bool], pool: Optional[GatewayPool] = None, interval: float = 10,
+                 recovery_interval: float = 1, ttl: float = 5):
+        self.probe = probe
+        self.pool = pool
+        self.interval = interval
+        self.recovery_interval = max(0.05, recovery_interval)
+        self.ttl = ttl
+        self.healthy: Optional[bool] = None
+        self.checked_at: Optional[float] = None
+        self._probe_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @classmethod
+    def from_dict(cls, probe: Callable[[], bool], pool: Optional[GatewayPool],
+                  settings: Optional[Dict[str, Any]]) -> "HealthMonitor":
+        """Build from the `health` config section"""
+        settings = settings or {}
+        return cls(probe, pool, interval=settings.get('interval', 10),
+                   recovery_interval=settings.get('recovery_interval', 1), ttl=settings.get('ttl', 5))
+    
+    def check(self) -> bool:
+        """Probe now; concurrent callers share one probe"""
+        requested = time.monotonic()
+        with self._probe_lock:
+            if self.checked_at is not None and self.checked_at >= requested:
+                return self.healthy
+            healthy = bool(self.probe())
+            self.healthy, self.checked_at = healthy, time.monotonic()
+            return healthy
+    
+    def is_healthy(self) -> bool:
+        """Last result while it is fresh, otherwise a new probe"""
+        if self.checked_at is not None and time.monotonic() - self.checked_at < self.ttl:
+            return self.healthy
+        return self.check()
+    
+    def wait_healthy(self, timeout: float) -> bool:
+        """Probe every recovery_interval until a gateway is up, at most timeout seconds"""
+        deadline = time.monotonic() + timeout
+        healthy = self.is_healthy()
+        while not healthy:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(remaining, self.recovery_interval))
+            healthy = self.check()
+        return True
+    
+    def degraded(self) -> bool:
+        """Last probe failed or some gateway is ejected"""
+        if self.healthy is False:
+            return True
+        return self.pool is not None and not all(node.healthy for node in self.pool.nodes)
+    
+    def start(self):
+        """Start background probing, a no-op when running already or interval is 0"""
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="gateway-health", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _run(self):
+        while not self._stop.wait(self.recovery_interval if self.degraded() else self.interval):
+            try:
+                self.check()
+            except Exception:
+                # A probe must not kill the monitor; the next one tries again
+                self.healthy = False
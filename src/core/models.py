@@ -1,26 +1,149 @@
+from array import array
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Union, overload
 from datetime import datetime
 
-@dataclass
+@dataclass(slots=True)
 class Contact:
     name: str
     phone: str
     message: str
     message_type: str = "SMS"  # SMS, WHATSAPP, CALL
+    row_index: Optional[int] = None  # spreadsheet row the contact came from
+    source_file: Optional[str] = None  # file the contact came from, set for multi-file batches
+    attributes: Optional[Dict[str, str]] = None  # extra columns the scheduler reads, e.g. 'diagnostico'
     
-@dataclass
+@dataclass(slots=True)
 class ProcessingResult:
     contact: Contact
     status: str  # "pending", "sent", "failed"
     timestamp: datetime
     error_message: Optional[str] = None
+    attempts: int = 1
+
+class ResultColumns:
+    """
+    Append-only, column-oriented store of ProcessingResults for large batches
+    Statuses and error messages are kept as small ints into interned tables and
+    timestamps as epoch floats, so a result costs ~23 bytes on top of its
+    Contact instead of a ProcessingResult plus a datetime. Indexing and iteration rebuild
+    ProcessingResult objects on demand, and status counts are kept as results
+    arrive
+    """
+    __slots__ = ('contacts', 'status_codes', 'timestamps', 'attempts', 'error_codes',
+                 '_status_names', '_codes', '_counts', '_error_messages', '_error_codes', 'retried')
+    
+    def __init__(self, results: Iterable[ProcessingResult] = ()):
+        self.contacts: List[Contact] = []
+        self.status_codes = array('B')
+        self.timestamps = array('d')
+        self.attempts = array('H')
+        self.error_codes = array('I')
+        self._error_messages: List[Optional[str]] = [None]
+        self._error_codes: Dict[str, int] = {}
+        self._status_names: List[str] = ["pending", "sent", "failed", "unknown"]
+        self._codes: Dict[str, int] = {name: code for code, name in enumerate(self._status_names)}
+        self._counts: List[int] = [0] * len(self._status_names)
+        self.retried = 0
+        self.extend(results)
+    
+    def _status_code(self, status: str) -> int:
+        code = self._codes.get(status)
+        if code is None:
+            # Gateway-specific status, interned on first sight
+            code = len(self._status_names)
+            self._status_names.append(status)
+            self._codes[status] = code
+            self._counts.append(0)
+        return code
+    
+    def _error_code(self, error_message: Optional[str]) -> int:
+        if error_message is None:
+            return 0
+        code = self._error_codes.get(error_message)
+        if code is None:
+            code = len(self._error_messages)
+            self._error_messages.append(error_message)
+            self._error_codes[error_message] = code
+        return code
+    
+    def append(self, result: ProcessingResult):
+        code = self._status_code(result.status)
+        self.error_codes.append(self._error_code(result.error_message))
+        self.contacts.append(result.contact)
+        self.status_codes.append(code)
+        self.timestamps.append(result.timestamp.timestamp())
+        self.attempts.append(min(result.attempts, 0xFFFF))
+        self._counts[code] += 1
+        if result.attempts > 1:
+            self.retried += 1
+    
+    def extend(self, results: Iterable[ProcessingResult]):
+        for result in results:
+            self.append(result)
+    
+    def count(self, status: str) -> int:
+        """Number of results with the given status, O(1)"""
+        code = self._codes.get(status)
+        return self._counts[code] if code is not None else 0
+    
+    @property
+    def successful(self) -> int:
+        return self.count("sent")
+    
+    @property
+    def failed(self) -> int:
+        return self.count("failed")
+    
+    def status_of(self, index: int) -> str:
+        return self._status_names[self.status_codes[index]]
+    
+    def _result(self, index: int) -> ProcessingResult:
+        return ProcessingResult(
+            contact=self.contacts[index],
+            status=self._status_names[self.status_codes[index]],
+            timestamp=datetime.fromtimestamp(self.timestamps[index]),
+            error_message=self._error_messages[self.error_codes[index]],
+            attempts=self.attempts[index]
+        )
+    
+    def iter_status(self, status: str) -> Iterator[ProcessingResult]:
+        """Results with the given status, only those are materialized"""
+        code = self._codes.get(status)
+        if code is None:
+            return
+        for index, row_code in enumerate(self.status_codes):
+            if row_code == code:
+                yield self._result(index)
+    
+    def __len__(self) -> int:
+        return len(self.contacts)
+    
+    @overload
+    def __getitem__(self, index: int) -> ProcessingResult: ...
+    @overload
+    def __getitem__(self, index: slice) -> List[ProcessingResult]: ...
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self._result(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("result index out of range")
+        return self._result(index)
+    
+    def __iter__(self) -> Iterator[ProcessingResult]:
+        for index in range(len(self)):
+            yield self._result(index)
     
-@dataclass
+@dataclass(slots=True)
 class BatchResult:
     batch_id: str
     total_contacts: int
     successful: int
     failed: int
-    results: List[ProcessingResult]
-    processing_time: float
\ No newline at end of file
+    results: Union[ResultColumns, List[ProcessingResult]]
+    processing_time: float
+    file_summaries: Optional[List[Dict]] = None  # one entry per input file of a multi-file batch
+    metrics: Optional[Dict] = None  # BatchMetrics.to_dict(): stage times, counters, throughput, latency
+    report_paths: Optional[List[str]] = None  # per-row report files written for the batch
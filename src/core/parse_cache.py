@@ -0,0 +1,113 @@
+import hashlib
+import os
+import pickle
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.models import Contact
+
+class ParseCache:
+    """
+    On-disk cache of validated (contacts, error_entries) per input file
+    Entries are keyed by the SHA-256 of the file's bytes plus a fingerprint
+    of the validation rules (ExcelProcessor.rules_fingerprint), so a renamed
+    copy of a file hits and a file edited in place or a rules change misses.
+    Entries are pickled; once the directory holds more than max_size_mb the
+    least recently used ones are evicted, and any entry unused for
+    max_age_hours is dropped
+    """
+    def __init__(self, directory: str, max_size_mb: float = 500, max_age_hours: float = 168):
+        self.directory = directory
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.max_age_seconds = max_age_hours * 3600
+        self.hits = 0
+        self.misses = 0
+    
+    @classmethod
+    def from_dict(cls, settings: Optional[Dict[str, Any]]) -> Optional["ParseCache"]:
+        """Build from the `cache` config section, None when disabled"""
+        settings = settings or {}
+        if not settings.get('enabled', False):
+            return None
+        return cls(
+            directory=settings.get('directory', '.parse_cache'),
+            max_size_mb=settings.get('max_size_mb', 500),
+            max_age_hours=settings.get('max_age_hours', 168)
+        )
+    
+    def key(self, file_path: str, rules_fingerprint: str) -> str:
+        """Content hash of the file combined with the rules fingerprint"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        digest.update(b'|' + rules_fingerprint.encode('utf-8'))
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> Optional[Tuple[List[Contact], List[Dict]]]:
+        """Cached (contacts, error_entries), None on a miss or an unreadable entry"""
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_seconds:
+                self._remove(path)
+                self.misses += 1
+                return None
+            with open(path, 'rb') as f:
+                contacts, errors = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # Truncated or from an incompatible version, rebuild it
+            self._remove(path)
+            self.misses += 1
+            return None
+        
+        # mtime doubles as last use, for LRU eviction
+        os.utime(path)
+        self.hits += 1
+        return contacts, errors
+    
+    def put(self, key: str, contacts: List[Contact], errors: List[Dict]):
+        """Store an entry atomically, then evict down to the size and age limits"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            pickle.dump((contacts, errors), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+        self.evict()
+    
+    def evict(self):
+        """Drop expired entries, then the least recently used ones until under max_size_mb"""
+        if not os.path.isdir(self.directory):
+            return
+        now = time.time()
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.pkl'):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.max_age_seconds:
+                self._remove(entry.path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+    
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
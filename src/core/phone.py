@@ -0,0 +1,69 @@
+import re
+from functools import lru_cache
+from typing import Optional, Tuple
+
+VALID_DDDS = frozenset([
+    '11', '12', '13', '14', '15', '16', '17', '18', '19',
+    '21', '22', '24', '27', '28', '31', '32', '33', '34',
+    '35', '37', '38', '41', '42', '43', '44', '45', '46',
+    '47', '48', '49', '51', '53', '54', '55', '61', '62',
+    '63', '64', '65', '66', '67', '68', '69', '71', '73',
+    '74', '75', '77', '79', '81', '82', '83', '84', '85',
+    '86', '87', '88', '89', '91', '92', '93', '94', '95',
+    '96', '97', '98', '99'
+])
+
+# Digits with the usual separators, optionally behind a + (E.164)
+PHONE_CHARS = re.compile(r'^\+?[\d\s().\-]+$')
+NON_DIGITS = re.compile(r'\D')
+# A number Excel stored as a float comes back as '1199998888.0'
+FLOAT_CELL = re.compile(r'^(\d+)\.0$')
+
+COUNTRY_CODE = '55'
+EXPECTED_FORMAT = "'XX - XXXX - XXXX', 'XX - 9XXXX - XXXX' or '+55 XX ...'"
+
+@lru_cache(maxsize=65536)
+def parse_phone(text: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    (canonical phone, None) for a valid Brazilian number, (None, error message) otherwise
+    Accepted: 10 digits (DDD + 8) or 11 digits (DDD + 9 + 8, mobiles), with
+    any spacing, dashes, dots or parentheses, optionally with a leading trunk
+    0, a 55 country code or in E.164 (+55...). The canonical form is
+    'DD - XXXX - XXXX' or 'DD - 9XXXX - XXXX'.
+    Memoized, so numbers repeated across rows and files are parsed once
+    """
+    stripped = text.strip()
+    float_cell = FLOAT_CELL.match(stripped)
+    if float_cell:
+        stripped = float_cell.group(1)
+    if not PHONE_CHARS.match(stripped):
+        return None, f"Invalid format. Expected {EXPECTED_FORMAT}, got '{text}'"
+    
+    digits = NON_DIGITS.sub('', stripped)
+    if stripped.startswith('+'):
+        if not digits.startswith(COUNTRY_CODE):
+            return None, f"Only Brazilian (+55) numbers are supported, got '{text}'"
+        digits = digits[len(COUNTRY_CODE):]
+    elif len(digits) in (12, 13) and digits.startswith(COUNTRY_CODE):
+        digits = digits[len(COUNTRY_CODE):]
+    elif len(digits) in (11, 12) and digits.startswith('0'):
+        digits = digits[1:]
+    
+    if len(digits) == 11 and digits[2] != '9':
+        return None, f"11-digit numbers must be mobiles starting with 9 after the DDD, got '{text}'"
+    if len(digits) not in (10, 11):
+        return None, f"Should have 10 or 11 digits, got {len(digits)}"
+    
+    ddd = digits[:2]
+    if ddd not in VALID_DDDS:
+        return None, f"Invalid DDD: {ddd}"
+    
+    return f"{ddd} - {digits[2:-4]} - {digits[-4:]}", None
+
+def normalize_phone(text: str) -> Optional[str]:
+    """Canonical form of a valid phone, None when it isn't one"""
+    return parse_phone(text)[0]
+
+def phone_error(text: str) -> Optional[str]:
+    """Why a phone is invalid, None when it is valid"""
+    return parse_phone(text)[1]
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+
+class TokenBucket:
+    """
+    Token bucket pacing sends to one gateway: `rate` messages per second
+    sustained, up to `burst` messages back to back
+    Callers reserve tokens before each request and wait out the returned
+    delay, so concurrent senders queue up instead of all hitting the gateway.
+    A 429 from the gateway halves the rate, successful sends creep it back up
+    """
+    def __init__(self, rate: float, burst: int = 1, min_rate: Optional[float] = None):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 8
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.total_wait = 0.0
+        self.throttled = 0
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_delay(cls, delay_between_messages: Optional[float], burst: int = 1) -> Optional["TokenBucket"]:
+        """Bucket matching processing.delay_between_messages, None when no delay is configured"""
+        if not delay_between_messages or delay_between_messages <= 0:
+            return None
+        return cls(rate=1.0 / delay_between_messages, burst=burst)
+    
+    def clone(self) -> "TokenBucket":
+        """Fresh bucket with the same settings, for another gateway"""
+        return TokenBucket(rate=self.max_rate, burst=self.capacity, min_rate=self.min_rate)
+    
+    def reserve(self, tokens: int = 1) -> float:
+        """Take tokens now and return how many seconds the caller must wait before sending"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.tokens -= tokens
+            
+            wait = max(0.0, self._paused_until - now, -self.tokens / self.rate)
+            self.total_wait += wait
+            return wait
+    
+    def acquire(self, tokens: int = 1) -> float:
+        """Block until tokens are available, returns the time spent waiting"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    async def acquire_async(self, tokens: int = 1) -> float:
+        """Non-blocking acquire() for the asyncio client"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+    
+    def throttle(self, retry_after: Optional[float] = None):
+        """Gateway answered 429: halve the rate and pause for retry_after seconds"""
+        with self._lock:
+            self.throttled += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+    
+    def recover(self):
+        """Request went through: step the rate back towards the configured maximum"""
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
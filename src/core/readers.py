@@ -0,0 +1,258 @@
+import json
+import os
+import pandas as pd
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Cell strings that pd.read_excel turns into NaN by default
+NA_STRINGS = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None',
+    'n/a', 'nan', 'null'
+])
+
+DELIMITERS = (',', ';', '\t', '|')
+
+def convert_cell(value):
+    """Mirror pd.read_excel cell conversion: integral floats to int, NA strings to NaN"""
+    if value is None:
+        return float('nan')
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value in NA_STRINGS:
+        return float('nan')
+    return value
+
+def rows_to_frame(rows: List[List], header: List, start_index: int) -> pd.DataFrame:
+    """Build an object-typed chunk frame indexed by data row number"""
+    return pd.DataFrame(
+        rows,
+        columns=header,
+        index=range(start_index, start_index + len(rows)),
+        dtype=object
+    )
+
+class TableReader:
+    """
+    Reads one input format into DataFrames indexed by data row number (0 = first row after the header)
+    `columns` names the columns the caller uses; readers that can skip the
+    others (CSV, Parquet, JSONL) load only those, Excel reads the whole sheet
+    """
+    extensions: tuple = ()
+    
+    def read(self, file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        chunks = list(self.iter_chunks(file_path, columns))
+        if len(chunks) == 1:
+            return chunks[0]
+        return pd.concat(chunks)
+    
+    def iter_chunks(self, file_path: str, columns: Optional[List[str]] = None,
+                    chunk_size: int = 1000) -> Iterator[pd.DataFrame]:
+        raise NotImplementedError
+
+class ExcelReader(TableReader):
+    extensions = ('.xlsx', '.xls')
+    
+    def read(self, file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        return pd.read_excel(file_path)
+    
+    def iter_chunks(self, file_path: str, columns: Optional[List[str]] = None,
+                    chunk_size: int = 1000) -> Iterator[pd.DataFrame]:
+        """
+        .xlsx files are read row by row with openpyxl in read-only mode, so
+        memory stays bounded by the chunk size, not the file size; .xls files
+        can't be streamed and are read whole, then chunked
+        """
+        if file_path.lower().endswith('.xls'):
+            return self._iter_dataframe_chunks(file_path, chunk_size)
+        return self._iter_workbook_chunks(file_path, chunk_size)
+    
+    def _iter_dataframe_chunks(self, file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """Read the whole sheet with pandas and hand it out in chunk_size slices"""
+        df = pd.read_excel(file_path)
+        if df.empty:
+            yield df
+            return
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+    
+    def _iter_workbook_chunks(self, file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """
+        Read the first sheet with openpyxl read-only mode, chunk_size rows at a time
+        Cells are converted the way pd.read_excel converts them, and trailing
+        empty rows are dropped, so row numbers line up with the pandas reader
+        """
+        from openpyxl import load_workbook
+        
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = self._build_header(next(rows, ()))
+            width = len(header)
+            
+            buffer = []
+            pending_empty = []
+            next_index = 0
+            for values in rows:
+                row = [convert_cell(value) for value in values[:width]]
+                row.extend([float('nan')] * (width - len(row)))
+                
+                if all(value is None or value == '' for value in values):
+                    # Only keep empty rows once a non-empty row follows them
+                    pending_empty.append(row)
+                    continue
+                
+                buffer.extend(pending_empty)
+                pending_empty = []
+                buffer.append(row)
+                
+                while len(buffer) >= chunk_size:
+                    yield rows_to_frame(buffer[:chunk_size], header, next_index)
+                    buffer = buffer[chunk_size:]
+                    next_index += chunk_size
+            
+            if buffer or next_index == 0:
+                yield rows_to_frame(buffer, header, next_index)
+        finally:
+            workbook.close()
+    
+    def _build_header(self, values: Iterable) -> List:
+        """Column names as pandas would name them, including 'Unnamed: n' and '.1' suffixes"""
+        header = []
+        seen = {}
+        for position, value in enumerate(values):
+            name = f"Unnamed: {position}" if value is None or value == '' else value
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            header.append(name)
+        return header
+
+class CsvReader(TableReader):
+    """
+    pandas' C parser, reading only the wanted columns and every cell as text
+    The delimiter (, ; tab or |) is taken from the header line
+    """
+    extensions = ('.csv',)
+    
+    def read(self, file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        return pd.read_csv(file_path, **self._options(file_path, columns))
+    
+    def iter_chunks(self, file_path: str, columns: Optional[List[str]] = None,
+                    chunk_size: int = 1000) -> Iterator[pd.DataFrame]:
+        # Chunks keep counting the index where the previous one stopped
+        with pd.read_csv(file_path, chunksize=chunk_size, **self._options(file_path, columns)) as chunks:
+            yield from chunks
+    
+    def _options(self, file_path: str, columns: Optional[List[str]]) -> Dict:
+        options = {'sep': self._sniff_delimiter(file_path), 'dtype': str, 'encoding': 'utf-8-sig'}
+        if columns is not None:
+            wanted = set(columns)
+            options['usecols'] = lambda name: name in wanted
+        return options
+    
+    def _sniff_delimiter(self, file_path: str) -> str:
+        """The candidate delimiter occurring most in the header line"""
+        with open(file_path, 'r', encoding='utf-8-sig', errors='replace') as f:
+            header = f.readline()
+        counts = {delimiter: header.count(delimiter) for delimiter in DELIMITERS}
+        delimiter = max(counts, key=counts.get)
+        return delimiter if counts[delimiter] else ','
+
+class ParquetReader(TableReader):
+    """Columnar reads through pyarrow, only the wanted columns are decoded"""
+    extensions = ('.parquet', '.pq')
+    
+    def read(self, file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        parquet_file = self._open(file_path)
+        return parquet_file.read(columns=self._present(parquet_file, columns)).to_pandas()
+    
+    def iter_chunks(self, file_path: str, columns: Optional[List[str]] = None,
+                    chunk_size: int = 1000) -> Iterator[pd.DataFrame]:
+        parquet_file = self._open(file_path)
+        next_index = 0
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=self._present(parquet_file, columns)):
+            df = batch.to_pandas()
+            df.index = range(next_index, next_index + len(df))
+            next_index += len(df)
+            yield df
+        if next_index == 0:
+            yield self.read(file_path, columns)
+    
+    def _open(self, file_path: str):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet files requires pyarrow (pip install pyarrow)")
+        return pq.ParquetFile(file_path)
+    
+    def _present(self, parquet_file, columns: Optional[List[str]]) -> Optional[List[str]]:
+        if columns is None:
+            return None
+        names = set(parquet_file.schema_arrow.names)
+        return [column for column in columns if column in names]
+
+class JsonLinesReader(TableReader):
+    """
+    One JSON object per line, streamed line by line
+    Values are converted like Excel cells and blank lines are ignored. The
+    columns are those of `columns` (or all keys) seen in the first chunk of
+    records, so a column no record has is reported missing like in a sheet;
+    a key missing from a later record is NaN
+    """
+    extensions = ('.jsonl', '.ndjson')
+    
+    def iter_chunks(self, file_path: str, columns: Optional[List[str]] = None,
+                    chunk_size: int = 1000) -> Iterator[pd.DataFrame]:
+        header = None
+        records = []
+        next_index = 0
+        for record in self._iter_records(file_path):
+            records.append(record)
+            if len(records) < chunk_size:
+                continue
+            if header is None:
+                header = self._header(records, columns)
+            yield rows_to_frame([self._row(record, header) for record in records], header, next_index)
+            next_index += len(records)
+            records = []
+        
+        if records or next_index == 0:
+            if header is None:
+                header = self._header(records, columns)
+            yield rows_to_frame([self._row(record, header) for record in records], header, next_index)
+    
+    def _iter_records(self, file_path: str) -> Iterator[Dict]:
+        with open(file_path, 'r', encoding='utf-8-sig') as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+                if not isinstance(record, dict):
+                    raise ValueError(f"Line {line_number} is not a JSON object")
+                yield record
+    
+    def _header(self, records: List[Dict], columns: Optional[List[str]]) -> List[str]:
+        seen = dict.fromkeys(key for record in records for key in record)
+        if columns is None:
+            return list(seen)
+        return [column for column in columns if column in seen]
+    
+    def _row(self, record: Dict, header: List[str]) -> List:
+        return [convert_cell(record.get(column)) for column in header]
+
+READERS = [ExcelReader(), CsvReader(), ParquetReader(), JsonLinesReader()]
+
+SUPPORTED_EXTENSIONS = tuple(extension for reader in READERS for extension in reader.extensions)
+
+def get_reader(file_path: str) -> TableReader:
+    """Reader for the file's extension"""
+    extension = os.path.splitext(file_path)[1].lower()
+    for reader in READERS:
+        if extension in reader.extensions:
+            return reader
+    raise ValueError(f"Unsupported file type '{extension}', expected one of {', '.join(SUPPORTED_EXTENSIONS)}")
@@ -0,0 +1,44 @@
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.models import ProcessingResult
+
+@dataclass
+class RetryPolicy:
+    """
+    How transient gateway failures are retried
+    Delays grow exponentially from backoff_base and are drawn with full
+    jitter, so parallel workers don't retry in lockstep
+    """
+    max_attempts: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    retry_statuses: Tuple[int, ...] = (429, 502, 503, 504)
+    retry_failed_contacts: bool = True  # also resend contacts the gateway reported as failed
+    
+    @classmethod
+    def from_dict(cls, settings: Optional[Dict[str, Any]]) -> "RetryPolicy":
+        """Build from the `retry` config section, unknown keys are ignored"""
+        settings = settings or {}
+        known = {key: value for key, value in settings.items() if key in cls.__dataclass_fields__}
+        if 'retry_statuses' in known:
+            known['retry_statuses'] = tuple(known['retry_statuses'])
+        return cls(**known)
+    
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait after the given (1-based) failed attempt"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+    
+    def is_retryable_status(self, status_code: int) -> bool:
+        return status_code in self.retry_statuses
+    
+    def contacts_to_retry(self, results: List[ProcessingResult], retryable: Optional[bool]) -> List[int]:
+        """
+        Positions of results worth another attempt
+        retryable is True for a transient request failure, False for a permanent
+        one and None when the gateway answered with per-contact results
+        """
+        if retryable is False or (retryable is None and not self.retry_failed_contacts):
+            return []
+        return [i for i, result in enumerate(results) if result.status == "failed"]
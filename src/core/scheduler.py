@@ -0,0 +1,178 @@
+import heapq
+import itertools
+import math
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.core.models import Contact
+
+# Contact fields rules can test besides extra spreadsheet columns
+CONTACT_FIELDS = ("name", "phone", "message", "message_type")
+RULE_OPERATORS = ("equals", "in", "contains", "matches", "empty")
+
+@dataclass
+class PriorityRule:
+    """
+    `column` <operator> `value` -> priority, e.g. diagnostico equals cirurgia -> 0
+    Text comparisons ignore case and surrounding whitespace; `matches` is a
+    regular expression searched in the cell, `empty` tests for a blank cell
+    """
+    column: str
+    operator: str
+    value: Any
+    priority: int
+    
+    def __post_init__(self):
+        if self.operator not in RULE_OPERATORS:
+            raise ValueError(f"Unknown scheduling rule operator '{self.operator}', expected one of {RULE_OPERATORS}")
+        if self.operator == "in":
+            self._values = {str(value).strip().casefold() for value in self.value}
+        elif self.operator == "matches":
+            self._pattern = re.compile(str(self.value), re.IGNORECASE)
+        elif self.operator != "empty":
+            self._text = str(self.value).strip().casefold()
+    
+    @classmethod
+    def from_dict(cls, settings: Dict[str, Any]) -> "PriorityRule":
+        """{column: diagnostico, equals: cirurgia, priority: 0}"""
+        operators = [key for key in settings if key in RULE_OPERATORS]
+        if 'column' not in settings or len(operators) != 1:
+            raise ValueError(f"Scheduling rule needs a column and one of {RULE_OPERATORS}: {settings}")
+        operator = operators[0]
+        return cls(settings['column'], operator, settings[operator], int(settings.get('priority', 0)))
+    
+    def applies(self, value: str) -> bool:
+        if self.operator == "empty":
+            return (value == "") == bool(self.value)
+        if self.operator == "matches":
+            return self._pattern.search(value) is not None
+        value = value.casefold()
+        if self.operator == "in":
+            return value in self._values
+        if self.operator == "contains":
+            return self._text in value
+        return value == self._text
+
+class SendScheduler:
+    """
+    Orders contacts for sending by priority, then deadline, then spreadsheet order
+    The first rule matching a contact sets its priority (lower is sent
+    first), default_priority otherwise. Within a priority, contacts with the
+    earliest date in deadline_column go first and those without one last.
+    Contacts queue up in a heap; order() ranks a whole batch, while a streamed
+    batch is reordered within the lookahead_rows contacts buffered ahead of
+    sending (see SendQueue)
+    """
+    def __init__(self, rules: Optional[List[PriorityRule]] = None, default_priority: int = 5,
+                 deadline_column: Optional[str] = None, date_format: str = "%d/%m/%Y", lookahead_rows: int = 5000):
+        self.rules = rules or []
+        self.default_priority = default_priority
+        self.deadline_column = deadline_column
+        self.date_format = date_format
+        self.lookahead_rows = max(0, lookahead_rows)
+        self._deadlines: Dict[str, float] = {}
+    
+    @classmethod
+    def from_dict(cls, settings: Optional[Dict[str, Any]]) -> Optional["SendScheduler"]:
+        """Build from the `scheduling` config section, None when disabled"""
+        settings = settings or {}
+        if not settings.get('enabled', False):
+            return None
+        return cls(
+            rules=[PriorityRule.from_dict(rule) for rule in settings.get('rules') or []],
+            default_priority=settings.get('default_priority', 5),
+            deadline_column=settings.get('deadline_column') or None,
+            date_format=settings.get('date_format', '%d/%m/%Y'),
+            lookahead_rows=settings.get('lookahead_rows', 5000)
+        )
+    
+    @property
+    def columns(self) -> List[str]:
+        """Spreadsheet columns the rules read, ExcelProcessor keeps them in Contact.attributes"""
+        columns = [rule.column for rule in self.rules]
+        if self.deadline_column:
+            columns.append(self.deadline_column)
+        return list(dict.fromkeys(column for column in columns if column not in CONTACT_FIELDS))
+    
+    def _value(self, contact: Contact, column: str) -> str:
+        if column in CONTACT_FIELDS:
+            return (getattr(contact, column) or "").strip()
+        return (contact.attributes or {}).get(column, "")
+    
+    def priority(self, contact: Contact) -> int:
+        for rule in self.rules:
+            if rule.applies(self._value(contact, rule.column)):
+                return rule.priority
+        return self.default_priority
+    
+    def deadline(self, contact: Contact) -> float:
+        """Epoch seconds of the contact's deadline, inf when it has none"""
+        if not self.deadline_column:
+            return math.inf
+        text = self._value(contact, self.deadline_column)
+        deadline = self._deadlines.get(text)
+        if deadline is None:
+            # Few distinct dates per file, each is parsed once
+            deadline = self._deadlines[text] = self._parse_date(text)
+        return deadline
+    
+    def _parse_date(self, text: str) -> float:
+        if not text:
+            return math.inf
+        try:
+            return datetime.strptime(text, self.date_format).timestamp()
+        except ValueError:
+            pass
+        try:
+            # Excel date cells arrive as '2025-08-29 00:00:00'
+            return datetime.fromisoformat(text).timestamp()
+        except ValueError:
+            return math.inf
+    
+    def key(self, contact: Contact) -> Tuple[int, float]:
+        return self.priority(contact), self.deadline(contact)
+    
+    def queue(self) -> "SendQueue":
+        return SendQueue(self)
+    
+    def order(self, contacts: List[Contact]) -> List[Contact]:
+        """All contacts, most urgent first"""
+        queue = self.queue()
+        queue.push(contacts)
+        return queue.pop(len(queue))
+
+class SendQueue:
+    """Heap of contacts waiting to be sent, ties keep their arrival order"""
+    def __init__(self, scheduler: SendScheduler):
+        self.scheduler = scheduler
+        self._heap: List[Tuple[int, float, int, Contact]] = []
+        self._sequence = itertools.count()
+    
+    def __len__(self) -> int:
+        return len(self._heap)
+    
+    def push(self, contacts: List[Contact]):
+        if not self._heap:
+            # A whole batch at once: heapify is O(n), pushing one by one O(n log n)
+            self._heap = [(*self.scheduler.key(contact), next(self._sequence), contact) for contact in contacts]
+            heapq.heapify(self._heap)
+            return
+        for contact in contacts:
+            heapq.heappush(self._heap, (*self.scheduler.key(contact), next(self._sequence), contact))
+    
+    def pop(self, count: int) -> List[Contact]:
+        """Up to `count` most urgent contacts"""
+        return [heapq.heappop(self._heap)[-1] for _ in range(min(count, len(self._heap)))]
+    
+    def feed(self, contacts: List[Contact], chunk_size: int) -> Iterator[List[Contact]]:
+        """Queue a streamed chunk, yielding full chunks to send while more than lookahead_rows are waiting"""
+        self.push(contacts)
+        while len(self._heap) >= self.scheduler.lookahead_rows + chunk_size:
+            yield self.pop(chunk_size)
+    
+    def drain(self, chunk_size: int) -> Iterator[List[Contact]]:
+        """Everything left, in chunks of chunk_size"""
+        while self._heap:
+            yield self.pop(chunk_size)
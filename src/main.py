@@ -1,29 +1,29 @@
 import argparse
+import glob
 import sys
 import os
+from itertools import islice
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 sys.path.insert(0, current_dir)
 
-from services.batch_processor import BatchProcessor
-from utils.config import Config
-from utils.logger import get_logger
+# pandas, requests and yaml are imported where they are used, so --help and a
+# mistyped path answer instantly and --validate-only never loads the HTTP stack
+from utils.logger import configure_from_config, get_logger
 
-def main():
-    parser = argparse.ArgumentParser(description='SMS Automation Backend')
-    parser.add_argument('excel_file', help='Path to Excel file with contacts')
-    
-    args = parser.parse_args()
-    
-    excel_file_path = os.path.abspath(args.excel_file)
-    
-    print(f"🔍 File path debug:")
-    print(f"   Input path: {args.excel_file}")
-    print(f"   Absolute path: {excel_file_path}")
-    print(f"   File exists: {os.path.exists(excel_file_path)}")
-    
+def expand_paths(patterns):
+    """Absolute paths for the given files and glob patterns, unmatched patterns kept as-is"""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else []
+        paths.extend(os.path.abspath(path) for path in (matches or [pattern]))
+    # A file named twice (or matched by two patterns) is processed once
+    return list(dict.fromkeys(paths))
+
+def check_excel_file(excel_file_path):
+    """Exit with a hint when the path is missing or not a supported input file"""
     if not os.path.exists(excel_file_path):
         print(f"❌ Error: File '{excel_file_path}' not found!")
         print(f"💡 Current directory: {os.getcwd()}")
@@ -33,21 +33,209 @@ def main():
         print("   3. Check for typos in file name")
         sys.exit(1)
     
-    if not excel_file_path.lower().endswith(('.xlsx', '.xls')):
-        print(f"❌ Error: File '{excel_file_path}' is not an Excel file!")
-        print("Please provide an .xlsx or .xls file.")
+    from src.core.readers import SUPPORTED_EXTENSIONS
+    
+    if not excel_file_path.lower().endswith(SUPPORTED_EXTENSIONS):
+        print(f"❌ Error: File '{excel_file_path}' is not a supported input file!")
+        print(f"Please provide a file of one of these types: {', '.join(SUPPORTED_EXTENSIONS)}")
         sys.exit(1)
+
+def build_processor(config):
+    """BatchProcessor wired from config.yaml"""
+    from services.batch_processor import BatchProcessor
+    
+    return BatchProcessor(
+        gateway_url=config.get('gateway.base_urls') or config.get('gateway.base_url'),
+        routing=config.get('gateway.routing', 'round_robin'),
+        sticky_ddd=config.get('gateway.sticky_ddd', False),
+        read_chunk_size=config.get('processing.read_chunk_size', 1000),
+        timeout=config.get('gateway.timeout', 30),
+        batch_size=config.get('processing.batch_size'),
+        max_in_flight=config.get('processing.max_in_flight_chunks', 1),
+        max_concurrent_sends=config.get('processing.max_concurrent_sends', 100),
+        delay_between_messages=config.get('processing.delay_between_messages'),
+        burst_size=config.get('processing.burst_size', 1),
+        retry_settings=config.get('retry', {}),
+        journal_dir=config.get('journal.directory'),
+        dedup_settings=config.get('deduplication', {}),
+        pipeline_depth=config.get('processing.pipeline_depth', 4),
+        parse_workers=config.get('processing.parse_workers', 0),
+        cache_settings=config.get('cache', {}),
+        metrics_settings=config.get('metrics', {}),
+        report_settings=config.get('reports', {}),
+        warning_samples=config.get('logging.sample_warnings', 5),
+        health_settings=config.get('health', {}),
+        scheduling_settings=config.get('scheduling', {})
+    )
+
+def watch(args):
+    """Service mode: one warm processor handling every file dropped into the inbox"""
+    from services.inbox_watcher import InboxWatcher
+    from utils.config import Config
     
     config = Config()
+    configure_from_config(config)
     logger = get_logger("main")
+    inbox_dir = os.path.abspath(args.watch or config.get('watch.inbox_dir', 'inbox'))
     
     try:
-        processor = BatchProcessor(
-            gateway_url=config.get('gateway.base_url')
+        processor = build_processor(config)
+        metrics_server = processor.start_metrics_server()
+        if metrics_server is not None:
+            print(f"📈 Metrics on http://localhost:{metrics_server.port}/metrics")
+        watcher = InboxWatcher(
+            processor,
+            inbox_dir=inbox_dir,
+            done_dir=os.path.abspath(config.get('watch.done_dir', 'done')),
+            failed_dir=os.path.abspath(config.get('watch.failed_dir', 'failed')),
+            poll_interval=config.get('watch.poll_interval', 5),
+            settle_seconds=config.get('watch.settle_seconds', 2),
+            streaming=args.stream
         )
+        print(f"👀 Watching {inbox_dir} for input files (Ctrl+C to stop)")
+        watcher.run()
+        if metrics_server is not None:
+            metrics_server.close()
+        print(f"👋 Stopped: {watcher.processed} files done, {watcher.failed} failed")
+    except Exception as e:
+        logger.error(f"💥 Application failed: {str(e)}")
+        print(f"💥 Critical error: {str(e)}")
+        sys.exit(1)
+
+def print_metrics(metrics):
+    """One line of stage times, one of throughput and gateway latency"""
+    if not metrics:
+        return
+    stages = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in metrics['stages'].items() if name != 'total')
+    if stages:
+        print(f"📊 Stages: {stages}")
+    throughput = metrics['throughput']
+    line = f"🚀 Throughput: {throughput['rows_per_second']:.0f} rows/s parsed, {throughput['messages_per_second']:.1f} msg/s sent"
+    for endpoint, latency in metrics['latency'].items():
+        line += f", {endpoint} p50 {latency['p50'] * 1000:.0f}ms / p95 {latency['p95'] * 1000:.0f}ms"
+    print(line)
+
+def print_more(hidden):
+    """Note how many rows were left off the console"""
+    if hidden > 0:
+        print(f"   … and {hidden} more, see the report files")
+
+def validate_only(excel_file_paths):
+    """Parse and validate the files without contacting the gateway, exit 1 if any row is invalid"""
+    import time
+    from services.parallel_loader import ParallelFileLoader
+    from services.report_writer import BatchReport
+    from src.core.parse_cache import ParseCache
+    from utils.config import Config
+    
+    config = Config()
+    loader = ParallelFileLoader(config.get('processing.parse_workers', 0), ParseCache.from_dict(config.get('cache', {})))
+    loads = {load.path: load for load in loader.load(excel_file_paths)}
+    report = BatchReport.from_dict(config.get('reports', {}), f"validation_{int(time.time())}")
+    console_rows = config.get('reports.console_rows', 10)
+    
+    print(f"\n🔎 VALIDATION ONLY (nothing was sent)")
+    issues = 0
+    for excel_file_path in excel_file_paths:
+        load = loads[excel_file_path]
+        file_name = os.path.basename(load.path)
+        if load.error is not None:
+            issues += 1
+            print(f"   💥 {file_name}: could not be read - {load.error}")
+            continue
+        issues += len(load.errors)
+        print(f"   📄 {file_name}: {len(load.contacts)} valid contacts, {len(load.errors)} validation errors "
+              f"({load.parse_time:.2f}s to parse)")
+        for error in load.errors[:console_rows]:
+            print(f"      📍 Row {error['row_index']}: {error['name']} - {error['error']}")
+        print_more(len(load.errors) - console_rows)
+        if report is not None:
+            report.record_errors(load.errors)
+    
+    if report is not None:
+        report.close()
+        if issues:
+            print(f"\n📄 Full report: {', '.join(report.paths)}")
+    if issues == 0:
+        print(f"\n✨ All rows are valid")
+        sys.exit(0)
+    print(f"\n⚠️  Found {issues} problems, see the report above")
+    sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(description='SMS Automation Backend')
+    parser.add_argument('excel_files', nargs='*', metavar='excel_file',
+                        help='Path to Excel file with contacts (CSV, Parquet and JSONL work too); several '
+                             'files or a glob such as "exports/*.xlsx" are parsed in parallel and sent as one batch')
+    parser.add_argument('--stream', action='store_true',
+                        help='Read the file in chunks and send each chunk while the next ones are parsed')
+    parser.add_argument('--async-send', action='store_true',
+                        help='Send through the asyncio gateway client')
+    parser.add_argument('--per-contact', action='store_true',
+                        help='With --async-send, send each contact on its own via /api/sms/send')
+    parser.add_argument('--resume', metavar='BATCH_ID',
+                        help='Resume an interrupted batch, skipping contacts its journal records as sent')
+    parser.add_argument('--validate-only', action='store_true',
+                        help='Only parse and validate the file(s), without loading the gateway client or sending')
+    parser.add_argument('--watch', nargs='?', const='', metavar='INBOX_DIR',
+                        help='Run as a service: process files dropped into INBOX_DIR '
+                             '(default watch.inbox_dir from config.yaml) until interrupted')
+    
+    args = parser.parse_args()
+    
+    if args.watch is not None:
+        if args.excel_files or args.async_send or args.resume:
+            parser.error("--watch takes no files and can't be combined with --async-send or --resume")
+        watch(args)
+        return
+    if not args.excel_files:
+        parser.error("at least one excel_file is required (or --watch)")
+    
+    excel_file_paths = expand_paths(args.excel_files)
+    multi_file = len(excel_file_paths) > 1
+    if multi_file and (args.stream or args.async_send):
+        parser.error("--stream and --async-send work on a single file")
+    
+    if not multi_file:
+        excel_file_path = excel_file_paths[0]
+        print(f"🔍 File path debug:")
+        print(f"   Input path: {args.excel_files[0]}")
+        print(f"   Absolute path: {excel_file_path}")
+        print(f"   File exists: {os.path.exists(excel_file_path)}")
+    
+    for excel_file_path in excel_file_paths:
+        check_excel_file(excel_file_path)
+    
+    if args.validate_only:
+        validate_only(excel_file_paths)
+    
+    from utils.config import Config
+    
+    config = Config()
+    configure_from_config(config)
+    logger = get_logger("main")
+    
+    try:
+        processor = build_processor(config)
         
-        print(f"📁 Processing file: {excel_file_path}")
-        result, validation_errors = processor.process_excel_file(excel_file_path)
+        if multi_file:
+            print(f"📁 Processing {len(excel_file_paths)} files")
+        else:
+            print(f"📁 Processing file: {excel_file_path}")
+        if args.resume:
+            print(f"🔁 Resuming batch: {args.resume}")
+        if multi_file:
+            result, validation_errors = processor.process_excel_files(excel_file_paths, resume_batch_id=args.resume)
+        elif args.async_send:
+            import asyncio
+            
+            result, validation_errors = asyncio.run(
+                processor.process_excel_file_async(excel_file_path, per_contact=args.per_contact,
+                                                   resume_batch_id=args.resume)
+            )
+        else:
+            result, validation_errors = processor.process_excel_file(excel_file_path, streaming=args.stream,
+                                                                     resume_batch_id=args.resume)
         
         print(f"\n🎉 BATCH PROCESSING COMPLETED!")
         print(f"📋 Batch ID: {result.batch_id}")
@@ -56,20 +244,44 @@ def main():
         print(f"❌ Failed to Send: {result.failed}")
         print(f"⚠️  Validation Errors: {len(validation_errors)}")
         print(f"⏱️  Processing Time: {result.processing_time:.2f} seconds")
+        print_metrics(result.metrics)
         
+        unreadable_files = 0
+        if result.file_summaries:
+            print(f"\n🗂️  PER-FILE SUMMARY:")
+            for summary in result.file_summaries:
+                file_name = os.path.basename(summary['file'])
+                if summary['error'] is not None:
+                    unreadable_files += 1
+                    print(f"   💥 {file_name}: could not be read - {summary['error']}")
+                    continue
+                print(f"   📄 {file_name}: {summary['valid_contacts']} valid, "
+                      f"{summary['validation_errors']} validation errors, {summary['skipped']} skipped, "
+                      f"{summary['sent']} sent, {summary['failed']} failed ({summary['parse_time']:.2f}s to parse)")
+        
+        # Only the first few rows on the console, the full lists are in the report files
+        console_rows = config.get('reports.console_rows', 10)
         if validation_errors:
             print(f"\n📝 VALIDATION ERRORS (These contacts were NOT processed):")
-            for error in validation_errors:
-                print(f"   📍 Row {error['row_index']}: {error['name']}")
+            for error in validation_errors[:console_rows]:
+                source = f"{os.path.basename(error['file'])} " if 'file' in error else ""
+                print(f"   📍 {source}Row {error['row_index']}: {error['name']}")
                 print(f"      📞 {error['phone_attempted']}")
                 print(f"      ❗ {error['error']}")
+            print_more(len(validation_errors) - console_rows)
         
         if result.failed > 0:
             print(f"\n🔥 SENDING FAILURES:")
-            for failed_result in [r for r in result.results if r.status == "failed"]:
-                print(f"   ❌ {failed_result.contact.name}: {failed_result.error_message}")
+            for failed_result in islice(result.results.iter_status("failed"), console_rows):
+                contact = failed_result.contact
+                source = f" ({os.path.basename(contact.source_file)} row {contact.row_index})" if contact.source_file else ""
+                print(f"   ❌ {contact.name}{source}: {failed_result.error_message}")
+            print_more(result.failed - console_rows)
+        
+        if result.report_paths:
+            print(f"\n📄 Full report: {', '.join(result.report_paths)}")
         
-        if result.failed == 0 and len(validation_errors) == 0:
+        if result.failed == 0 and len(validation_errors) == 0 and unreadable_files == 0:
             print(f"\n✨ SUCCESS: All contacts processed successfully!")
             sys.exit(0)
         else:
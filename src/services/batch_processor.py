@@ -1,60 +1,515 @@
-from typing import Tuple, List, Dict
+from typing import Tuple, List, Dict, Optional, Any, Callable, Hashable, Set, Union
 from datetime import datetime
+import asyncio
+import os
 import time
 
-from src.core.models import Contact, ProcessingResult, BatchResult
+from src.core.models import Contact, ProcessingResult, BatchResult, ResultColumns
 from src.core.api_client import KotlinGatewayClient
 from src.core.excel_processor import ExcelProcessor
-from src.utils.logger import get_logger
+from src.core.health_monitor import GatewayUnavailableError, HealthMonitor
+from src.core.parse_cache import ParseCache
+from src.core.rate_limiter import TokenBucket
+from src.core.retry import RetryPolicy
+from src.core.deduplicator import ContactDeduplicator
+from src.core.scheduler import SendScheduler
+from src.services.journal import SendJournal, row_key
+from src.services.parallel_loader import ParallelFileLoader
+from src.services.pipeline import Prefetcher
+from src.services.report_writer import BatchReport
+from src.utils.logger import SampledWarnings, get_logger
+from src.utils.metrics import BatchMetrics, MetricsServer
+
+def resolve_sources(paths: str) -> str:
+    """A journal header's comma-separated file list with every path made absolute"""
+    return ", ".join(os.path.abspath(path.strip()) for path in paths.split(", "))
 
 class BatchProcessor:
-    def __init__(self, gateway_url: str = "http://localhost:8080"):
-        self.excel_processor = ExcelProcessor()
-        self.api_client = KotlinGatewayClient(gateway_url)
+    def __init__(self, gateway_url: Union[str, List[str]] = "http://localhost:8080", read_chunk_size: int = 1000,
+                 timeout: int = 30, batch_size: Optional[int] = None, max_in_flight: int = 1,
+                 max_concurrent_sends: int = 100, delay_between_messages: Optional[float] = None,
+                 burst_size: int = 1, retry_settings: Optional[Dict[str, Any]] = None,
+                 journal_dir: Optional[str] = None, dedup_settings: Optional[Dict[str, Any]] = None,
+                 pipeline_depth: int = 4, routing: str = "round_robin", sticky_ddd: bool = False,
+                 parse_workers: int = 0, cache_settings: Optional[Dict[str, Any]] = None,
+                 metrics_settings: Optional[Dict[str, Any]] = None,
+                 report_settings: Optional[Dict[str, Any]] = None, warning_samples: int = 5,
+                 health_settings: Optional[Dict[str, Any]] = None, scheduling_settings: Optional[Dict[str, Any]] = None):
+        self.parse_cache = ParseCache.from_dict(cache_settings)
+        # Send order by priority/deadline rules, None keeps spreadsheet order
+        self.scheduler = SendScheduler.from_dict(scheduling_settings)
+        extra_columns = self.scheduler.columns if self.scheduler is not None else []
+        self.excel_processor = ExcelProcessor(self.parse_cache, extra_columns)
+        self.rate_limiter = TokenBucket.from_delay(delay_between_messages, burst_size)
+        self.retry_policy = RetryPolicy.from_dict(retry_settings)
+        health_settings = health_settings or {}
+        # How long a batch waits for a gateway that is down, before starting and between sends
+        self.max_outage = health_settings.get('max_outage_seconds', 60)
+        self.api_client = KotlinGatewayClient(gateway_url, timeout=timeout, batch_size=batch_size,
+                                              max_in_flight=max_in_flight, rate_limiter=self.rate_limiter,
+                                              retry_policy=self.retry_policy, routing=routing,
+                                              sticky_ddd=sticky_ddd,
+                                              health_timeout=health_settings.get('timeout', 5),
+                                              max_outage=self.max_outage,
+                                              failure_threshold=health_settings.get('failure_threshold', 3),
+                                              eject_seconds=health_settings.get('reset_seconds', 30))
+        self.health_monitor = HealthMonitor.from_dict(self.api_client.health_check, self.api_client.pool, health_settings)
+        self.gateway_url = gateway_url
+        self.max_concurrent_sends = max_concurrent_sends
+        self.read_chunk_size = read_chunk_size
+        self.pipeline_depth = pipeline_depth
+        self.journal_dir = journal_dir
+        self.deduplicator = ContactDeduplicator.from_dict(dedup_settings)
+        self.file_loader = ParallelFileLoader(parse_workers, self.parse_cache, extra_columns)
+        self._batch_ids: Dict[str, int] = {}
+        metrics_settings = metrics_settings or {}
+        self.metrics_dir = metrics_settings.get('json_dir')
+        self.metrics_port = metrics_settings.get('prometheus_port', 0)
+        # Current batch's metrics, and every batch of this processor added up
+        self.metrics = BatchMetrics()
+        self.total_metrics = BatchMetrics("total")
+        self.report_settings = report_settings
+        # Current batch's report, None when reports are disabled
+        self.report: Optional[BatchReport] = None
         self.logger = get_logger(__name__)
+        # Validation warnings of the current batch: the first few logged, the rest counted
+        self.warning_samples = warning_samples
+        self.validation_warnings = SampledWarnings(self.logger, warning_samples)
     
-    def process_excel_file(self, excel_file_path: str) -> Tuple[BatchResult, List[Dict]]:
-        """Process Excel file and return both results and validation errors"""
+    def process_excel_file(self, excel_file_path: str, streaming: bool = False,
+                           resume_batch_id: Optional[str] = None) -> Tuple[BatchResult, List[Dict]]:
+        """
+        Process Excel file and return both results and validation errors
+        With streaming=True the file is read in chunks of read_chunk_size rows
+        and each chunk is sent as soon as it is parsed; with pipeline_depth > 0
+        parsing runs on its own thread, up to pipeline_depth chunks ahead
+        With resume_batch_id, contacts the journal of that batch already
+        recorded as sent are skipped
+        """
         start_time = time.time()
-        batch_id = f"batch_{int(datetime.now().timestamp())}"
+        batch_id = resume_batch_id or self._new_batch_id()
         
         self.logger.info(f"Starting batch {batch_id} with file: {excel_file_path}")
         
+        self._start_batch(batch_id)
+        journal = self._open_journal(batch_id, excel_file_path, resume_batch_id is not None)
+        self.report = BatchReport.from_dict(self.report_settings, batch_id)
+        if self.deduplicator is not None:
+            self.deduplicator.start_run()
         try:
+            if streaming:
+                return self._process_excel_stream(excel_file_path, batch_id, start_time, journal)
+            
             valid_contacts, validation_errors = self.excel_processor.load_contacts_from_excel(excel_file_path)
             
             self.logger.info(f"Loaded {len(valid_contacts)} valid contacts, {len(validation_errors)} validation errors")
             
-            for error in validation_errors:
-                self.logger.warning(f"Row {error['row_index']} - {error['name']}: {error['error']}")
+            self._log_validation_errors(validation_errors)
+            with self.metrics.stage('dedup'):
+                valid_contacts = self._skip_completed(valid_contacts, journal.completed_rows() if journal is not None else set())
+                valid_contacts = self._deduplicate(valid_contacts, validation_errors)
+            valid_contacts = self._schedule(valid_contacts)
             
-            if not self.api_client.health_check():
-                raise Exception("Kotlin gateway is not available. Please ensure the mobile app is running.")
+            self._check_gateway()
             
+            processing_results = ResultColumns()
             if valid_contacts:
-                processing_results = self.api_client.send_batch_sms(valid_contacts)
+                with self.metrics.stage('send'):
+                    processing_results.extend(self.api_client.send_batch_sms(valid_contacts, on_results=self._results_callback(journal)))
             else:
-                processing_results = []
                 self.logger.warning("No valid contacts to process")
             
-            successful = len([r for r in processing_results if r.status == "sent"])
-            failed = len([r for r in processing_results if r.status == "failed"])
-            
-            processing_time = time.time() - start_time
+            return self._build_result(batch_id, len(valid_contacts), processing_results, validation_errors, start_time), validation_errors
             
-            batch_result = BatchResult(
-                batch_id=batch_id,
-                total_contacts=len(valid_contacts),
-                successful=successful,
-                failed=failed,
-                results=processing_results,
-                processing_time=processing_time
+        except Exception as e:
+            self.logger.error(f"Batch {batch_id} failed: {str(e)}")
+            raise
+        finally:
+            self._finish_run(journal)
+    
+    async def process_excel_file_async(self, excel_file_path: str, per_contact: bool = False,
+                                       resume_batch_id: Optional[str] = None) -> Tuple[BatchResult, List[Dict]]:
+        """
+        Async variant of process_excel_file built on AsyncKotlinGatewayClient
+        With per_contact=True every contact goes through /api/sms/send, up to
+        max_concurrent_sends at a time, instead of /api/sms/batch
+        """
+        from src.core.async_api_client import AsyncKotlinGatewayClient
+        
+        start_time = time.time()
+        batch_id = resume_batch_id or self._new_batch_id()
+        
+        self.logger.info(f"Starting async batch {batch_id} with file: {excel_file_path}")
+        
+        self._start_batch(batch_id)
+        journal = self._open_journal(batch_id, excel_file_path, resume_batch_id is not None)
+        self.report = BatchReport.from_dict(self.report_settings, batch_id)
+        if self.deduplicator is not None:
+            self.deduplicator.start_run()
+        try:
+            valid_contacts, validation_errors = await asyncio.to_thread(
+                self.excel_processor.load_contacts_from_excel, excel_file_path
             )
             
-            self.logger.info(f"Batch {batch_id} completed: {successful} successful, {failed} failed, {len(validation_errors)} validation errors")
+            self.logger.info(f"Loaded {len(valid_contacts)} valid contacts, {len(validation_errors)} validation errors")
+            
+            self._log_validation_errors(validation_errors)
+            with self.metrics.stage('dedup'):
+                valid_contacts = self._skip_completed(valid_contacts, journal.completed_rows() if journal is not None else set())
+                valid_contacts = self._deduplicate(valid_contacts, validation_errors)
+            valid_contacts = self._schedule(valid_contacts)
+            
+            async with AsyncKotlinGatewayClient(
+                self.gateway_url,
+                timeout=self.api_client.timeout,
+                batch_size=self.api_client.batch_size,
+                max_in_flight=self.api_client.max_in_flight,
+                max_concurrent_sends=self.max_concurrent_sends,
+                rate_limiter=self.rate_limiter,
+                retry_policy=self.retry_policy,
+                pool=self.api_client.pool,
+                health_timeout=self.api_client.health_timeout,
+                max_outage=self.max_outage
+            ) as client:
+                client.metrics = self.metrics
+                # The monitor probes with the sync client, off the event loop
+                await asyncio.to_thread(self._check_gateway)
+                
+                processing_results = ResultColumns()
+                if not valid_contacts:
+                    self.logger.warning("No valid contacts to process")
+                elif per_contact:
+                    with self.metrics.stage('send'):
+                        processing_results.extend(await client.send_many_sms(valid_contacts, on_results=self._results_callback(journal)))
+                else:
+                    with self.metrics.stage('send'):
+                        processing_results.extend(await client.send_batch_sms(valid_contacts, on_results=self._results_callback(journal)))
             
+            return self._build_result(batch_id, len(valid_contacts), processing_results, validation_errors, start_time), validation_errors
+            
+        except Exception as e:
+            self.logger.error(f"Batch {batch_id} failed: {str(e)}")
+            raise
+        finally:
+            self._finish_run(journal)
+    
+    def process_excel_files(self, excel_file_paths: List[str],
+                            resume_batch_id: Optional[str] = None) -> Tuple[BatchResult, List[Dict]]:
+        """
+        Process several Excel files as one batch
+        Files are parsed in parallel worker processes and each file's contacts
+        are sent as soon as it is parsed, through the same dedup/journal/send
+        path as a single file. Contacts and errors carry the file they came from,
+        and result.file_summaries holds the per-file counts. A file that can't be
+        read is reported in its summary without stopping the others
+        """
+        start_time = time.time()
+        batch_id = resume_batch_id or self._new_batch_id()
+        
+        self.logger.info(f"Starting batch {batch_id} with {len(excel_file_paths)} files")
+        
+        self._start_batch(batch_id)
+        journal = self._open_journal(batch_id, ", ".join(excel_file_paths), resume_batch_id is not None)
+        self.report = BatchReport.from_dict(self.report_settings, batch_id)
+        if self.deduplicator is not None:
+            self.deduplicator.start_run()
+        try:
+            self._check_gateway()
+            
+            summaries = {path: {'file': path, 'valid_contacts': 0, 'validation_errors': 0, 'skipped': 0,
+                                'sent': 0, 'failed': 0, 'parse_time': 0.0, 'error': None}
+                         for path in excel_file_paths}
+            completed_rows = journal.completed_rows() if journal is not None else set()
+            total_contacts = 0
+            processing_results = ResultColumns()
+            validation_errors = []
+            
+            loads = self.file_loader.load(excel_file_paths)
+            try:
+                for load in loads:
+                    summary = summaries[load.path]
+                    summary['parse_time'] = load.parse_time
+                    # Parsed in a worker process, so its read/validate split is not seen here
+                    self.metrics.add_time('parse', load.parse_time)
+                    self.metrics.count('rows_parsed', len(load.contacts) + len(load.errors))
+                    if load.error is not None:
+                        self.logger.error(f"Skipping {load.path}: {load.error}")
+                        summary['error'] = load.error
+                        continue
+                    
+                    self.logger.info(f"Loaded {load.path}: {len(load.contacts)} valid contacts, "
+                                     f"{len(load.errors)} validation errors in {load.parse_time:.2f}s")
+                    self._log_validation_errors(load.errors)
+                    validation_errors.extend(load.errors)
+                    summary['valid_contacts'] = len(load.contacts)
+                    summary['validation_errors'] = len(load.errors)
+                    
+                    contacts = load.contacts
+                    with self.metrics.stage('dedup'):
+                        contacts = self._skip_completed(contacts, completed_rows)
+                        contacts = self._deduplicate(contacts, validation_errors)
+                    summary['skipped'] = len(load.contacts) - len(contacts)
+                    contacts = self._schedule(contacts)
+                    
+                    if contacts:
+                        total_contacts += len(contacts)
+                        with self.metrics.stage('send'):
+                            results = self.api_client.send_batch_sms(contacts, on_results=self._results_callback(journal))
+                        processing_results.extend(results)
+                        summary['sent'] = sum(1 for result in results if result.status == "sent")
+                        summary['failed'] = sum(1 for result in results if result.status == "failed")
+            finally:
+                loads.close()
+            
+            if total_contacts == 0:
+                self.logger.warning("No valid contacts to process")
+            
+            batch_result = self._build_result(batch_id, total_contacts, processing_results, validation_errors, start_time)
+            batch_result.file_summaries = list(summaries.values())
             return batch_result, validation_errors
             
         except Exception as e:
             self.logger.error(f"Batch {batch_id} failed: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+        finally:
+            self._finish_run(journal)
+    
+    def _process_excel_stream(self, excel_file_path: str, batch_id: str, start_time: float,
+                              journal: Optional[SendJournal]) -> Tuple[BatchResult, List[Dict]]:
+        """
+        Parse and send chunk by chunk, so sending starts before the file is read
+        Only parsing is bounded by the chunks: the results (with their
+        Contacts) and the validation errors are kept for the whole file, so
+        they still grow with it. The parser starts before the health check,
+        so both overlap. With a scheduler, contacts are reordered within its
+        lookahead_rows window
+        """
+        send_queue = self.scheduler.queue() if self.scheduler is not None else None
+        chunks = self.excel_processor.stream_contacts_from_excel(excel_file_path, self.read_chunk_size)
+        if self.pipeline_depth > 0:
+            chunks = Prefetcher(chunks, depth=self.pipeline_depth, name=f"parser-{batch_id}")
+        
+        try:
+            self._check_gateway()
+            
+            total_contacts = 0
+            processing_results = ResultColumns()
+            validation_errors = []
+            completed_rows = journal.completed_rows() if journal is not None else set()
+            
+            for valid_contacts, chunk_errors in chunks:
+                self.logger.info(f"Loaded chunk: {len(valid_contacts)} valid contacts, {len(chunk_errors)} validation errors")
+                
+                self._log_validation_errors(chunk_errors)
+                validation_errors.extend(chunk_errors)
+                with self.metrics.stage('dedup'):
+                    valid_contacts = self._skip_completed(valid_contacts, completed_rows)
+                    valid_contacts = self._deduplicate(valid_contacts, validation_errors)
+                
+                total_contacts += len(valid_contacts)
+                if send_queue is None:
+                    self._send_chunk(valid_contacts, processing_results, journal)
+                    continue
+                with self.metrics.stage('schedule'):
+                    ready = list(send_queue.feed(valid_contacts, self.read_chunk_size))
+                for contacts in ready:
+                    self._send_chunk(contacts, processing_results, journal)
+            
+            if send_queue is not None:
+                for contacts in send_queue.drain(self.read_chunk_size):
+                    self._send_chunk(contacts, processing_results, journal)
+        finally:
+            chunks.close()
+        
+        if total_contacts == 0:
+            self.logger.warning("No valid contacts to process")
+        
+        return self._build_result(batch_id, total_contacts, processing_results, validation_errors, start_time), validation_errors
+    
+    def _send_chunk(self, contacts: List[Contact], processing_results: ResultColumns, journal: Optional[SendJournal]):
+        if contacts:
+            with self.metrics.stage('send'):
+                processing_results.extend(self.api_client.send_batch_sms(contacts, on_results=self._results_callback(journal)))
+    
+    def _schedule(self, contacts: List[Contact]) -> List[Contact]:
+        """Contacts in send order, most urgent first when scheduling is enabled"""
+        if self.scheduler is None or not contacts:
+            return contacts
+        with self.metrics.stage('schedule'):
+            return self.scheduler.order(contacts)
+    
+    def _check_gateway(self):
+        """
+        Make sure a gateway is up, waiting up to max_outage seconds for one,
+        then keep the health monitor probing while the batch sends
+        A result from the monitor younger than health.ttl is reused
+        """
+        with self.metrics.stage('health_check'):
+            available = self.health_monitor.is_healthy()
+            if not available and self.max_outage:
+                self.logger.warning(f"Kotlin gateway is not available, waiting up to {self.max_outage}s for it")
+                available = self.health_monitor.wait_healthy(self.max_outage)
+        if not available:
+            raise GatewayUnavailableError("Kotlin gateway is not available. Please ensure the mobile app is running.")
+        self.health_monitor.start()
+    
+    def _start_batch(self, batch_id: str):
+        """Fresh per-batch state: metrics, handed to the parser and the gateway client, and warning counts"""
+        self.validation_warnings = SampledWarnings(self.logger, self.warning_samples)
+        self.metrics = BatchMetrics(batch_id)
+        self.excel_processor.metrics = self.metrics
+        self.api_client.metrics = self.metrics
+    
+    def start_metrics_server(self) -> Optional[MetricsServer]:
+        """Serve total_metrics on /metrics when metrics.prometheus_port is set, for long-running (--watch) processes"""
+        if not self.metrics_port:
+            return None
+        server = MetricsServer(self.total_metrics.to_prometheus, self.metrics_port)
+        self.logger.info(f"Serving metrics on port {server.port}")
+        return server
+    
+    def _new_batch_id(self) -> str:
+        """batch_<epoch seconds>, suffixed when a long-running process starts two batches in one second"""
+        batch_id = f"batch_{int(datetime.now().timestamp())}"
+        self._batch_ids[batch_id] = self._batch_ids.get(batch_id, 0) + 1
+        if self._batch_ids[batch_id] > 1:
+            batch_id = f"{batch_id}_{self._batch_ids[batch_id]}"
+        return batch_id
+    
+    def _open_journal(self, batch_id: str, excel_file_path: str, resume: bool) -> Optional[SendJournal]:
+        """Journal for this batch, None when journaling is disabled"""
+        if self.journal_dir is None:
+            if resume:
+                raise ValueError("Cannot resume a batch without a journal directory")
+            return None
+        if resume and not SendJournal.exists(self.journal_dir, batch_id):
+            raise ValueError(f"No journal found for batch {batch_id} in {self.journal_dir}")
+        
+        journal = SendJournal(self.journal_dir, batch_id)
+        if not resume:
+            journal.write_header(resolve_sources(excel_file_path))
+            return journal
+        
+        # A different file would have other patients on the journaled rows
+        started_from = journal.source_file()
+        if started_from is not None and resolve_sources(started_from) != resolve_sources(excel_file_path):
+            journal.close()
+            raise ValueError(f"Batch {batch_id} was started from {started_from}, not {excel_file_path}; "
+                             f"refusing to resume with a different file")
+        return journal
+    
+    def _skip_completed(self, contacts: List[Contact], completed_rows: Set[Hashable]) -> List[Contact]:
+        """
+        Drop contacts the journal already records as sent
+        The deduplicator still counts them as seen, so a later repeat of a
+        row the first attempt sent is skipped again rather than sent on resume
+        """
+        if not completed_rows:
+            return contacts
+        completed = []
+        remaining = []
+        for contact in contacts:
+            (completed if row_key(contact) in completed_rows else remaining).append(contact)
+        if self.deduplicator is not None:
+            self.deduplicator.remember(completed)
+        if completed:
+            self.logger.info(f"Resumed batch: skipping {len(completed)} contacts already sent")
+        return remaining
+    
+    def _deduplicate(self, contacts: List[Contact], validation_errors: List[Dict]) -> List[Contact]:
+        """Drop repeated contacts, adding one skip entry per dropped row to validation_errors"""
+        if self.deduplicator is None or not contacts:
+            return contacts
+        unique, skipped = self.deduplicator.filter(contacts)
+        if skipped:
+            self.logger.info(f"Skipped {len(skipped)} duplicate contacts")
+            self._log_validation_errors(skipped)
+            validation_errors.extend(skipped)
+        return unique
+    
+    def _results_callback(self, journal: Optional[SendJournal]) -> Optional[Callable[[List[ProcessingResult]], None]]:
+        """on_results callback recording each finished chunk in the journal, dedup index and report"""
+        if journal is None and self.deduplicator is None and self.report is None:
+            return None
+        
+        def record(results: List[ProcessingResult]):
+            if journal is not None:
+                journal.record(results)
+            if self.deduplicator is not None:
+                self.deduplicator.mark_sent(results)
+            if self.report is not None:
+                self.report.record_results(results)
+        return record
+    
+    def _finish_run(self, journal: Optional[SendJournal]):
+        """Persist run state whether the batch succeeded or not"""
+        self.health_monitor.stop()
+        if journal is not None:
+            journal.close()
+        if self.deduplicator is not None:
+            self.deduplicator.save()
+        if self.report is not None:
+            try:
+                self.report.close()
+            except Exception as e:
+                self.logger.error(f"Report for batch {self.report.batch_id} is incomplete: {e}")
+        
+        self.validation_warnings.summary(f"Batch {self.metrics.batch_id} validation")
+        self.total_metrics.merge(self.metrics)
+        if self.metrics_dir:
+            try:
+                self.metrics.write_json(self.metrics_dir)
+            except OSError as e:
+                self.logger.warning(f"Could not write metrics for batch {self.metrics.batch_id}: {e}")
+    
+    def _log_validation_errors(self, validation_errors: List[Dict]):
+        """Add validation errors to the report and log a sample of them, see SampledWarnings"""
+        if self.report is not None:
+            self.report.record_errors(validation_errors)
+        for error in validation_errors:
+            source = f"{os.path.basename(error['file'])} " if 'file' in error else ""
+            reason = "duplicate skipped" if error.get('type') == 'duplicate' else error['error']
+            self.validation_warnings.warn(reason, f"{source}Row {error['row_index']} - {error['name']}: {error['error']}")
+    
+    def _build_result(self, batch_id: str, total_contacts: int, processing_results: ResultColumns,
+                      validation_errors: List[Dict], start_time: float) -> BatchResult:
+        """Wrap the collected results into a BatchResult, counts come from the running tallies"""
+        successful = processing_results.successful
+        failed = processing_results.failed
+        retried = processing_results.retried
+        
+        processing_time = time.time() - start_time
+        
+        batch_result = BatchResult(
+            batch_id=batch_id,
+            total_contacts=total_contacts,
+            successful=successful,
+            failed=failed,
+            results=processing_results,
+            processing_time=processing_time
+        )
+        
+        self.metrics.add_time('total', processing_time)
+        self.metrics.count('messages_sent', successful)
+        self.metrics.count('messages_failed', failed)
+        self.metrics.count('validation_errors', len(validation_errors))
+        batch_result.metrics = self.metrics.to_dict()
+        if self.report is not None:
+            batch_result.report_paths = list(self.report.paths)
+        
+        self.logger.info(f"Batch {batch_id} completed: {successful} successful, {failed} failed, {len(validation_errors)} validation errors")
+        if retried:
+            self.logger.info(f"Batch {batch_id}: {retried} contacts needed more than one attempt")
+        if self.parse_cache is not None and self.parse_cache.hits:
+            self.logger.info(f"Parse cache: {self.parse_cache.hits} files loaded without parsing")
+        for url, rate_limiter in self.api_client.pool.rate_limiters():
+            self.logger.info(f"Rate limiter {url}: {rate_limiter.total_wait:.2f}s spent waiting, "
+                             f"{rate_limiter.throttled} throttle responses, "
+                             f"current rate {rate_limiter.rate:.2f} msg/s")
+        if len(self.api_client.pool.nodes) > 1:
+            for node in self.api_client.pool.nodes:
+                self.logger.info(f"Gateway {node.url}: {node.sent} messages sent, {node.failures} ejections")
+        stages = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in batch_result.metrics['stages'].items())
+        self.logger.info(f"Batch {batch_id} stages: {stages}")
+        
+        return batch_result
\ No newline at end of file
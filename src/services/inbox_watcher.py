@@ -0,0 +1,136 @@
+import os
+import shutil
+import signal
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.core.health_monitor import GatewayUnavailableError
+from src.core.readers import SUPPORTED_EXTENSIONS
+from src.services.batch_processor import BatchProcessor
+from src.utils.logger import get_logger
+
+class InboxWatcher:
+    """
+    Long-running service processing input files as they land in an inbox directory
+    One BatchProcessor is reused for every file, so the parsed config, the pooled
+    keep-alive gateway connections and the dedup index stay warm between files.
+    A file is picked up once its size and mtime stopped changing for settle_seconds
+    (so half-copied files are left alone), then moved to done_dir or, if it could
+    not be processed, to failed_dir. While no gateway is reachable files stay in
+    the inbox and are retried on a later poll
+    """
+    def __init__(self, processor: BatchProcessor, inbox_dir: str, done_dir: str, failed_dir: str,
+                 poll_interval: float = 5.0, settle_seconds: float = 2.0, streaming: bool = False):
+        self.processor = processor
+        self.inbox_dir = inbox_dir
+        self.done_dir = done_dir
+        self.failed_dir = failed_dir
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.streaming = streaming
+        self.processed = 0
+        self.failed = 0
+        self._stop = threading.Event()
+        self._seen: Dict[str, Tuple[int, float, float]] = {}
+        self._unmovable: Set[str] = set()
+        self.logger = get_logger(__name__)
+        
+        for directory in (inbox_dir, done_dir, failed_dir):
+            os.makedirs(directory, exist_ok=True)
+    
+    def stop(self, *_):
+        """Finish the current file, then leave run(); usable as a signal handler"""
+        self._stop.set()
+    
+    def run(self):
+        """Poll the inbox until stop() is called (SIGINT/SIGTERM when run from the main thread)"""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+        
+        self.logger.info(f"Watching {self.inbox_dir} every {self.poll_interval:g}s")
+        while not self._stop.is_set():
+            self.poll()
+            self._stop.wait(self.poll_interval)
+        self.logger.info(f"Stopped watching {self.inbox_dir}: {self.processed} files done, {self.failed} failed")
+    
+    def poll(self) -> int:
+        """Process every settled file currently in the inbox, returns how many were handled"""
+        ready = self.ready_files()
+        handled = 0
+        for path in ready:
+            if self._stop.is_set():
+                break
+            # Checked before each file, the gateway can go down while earlier ones send;
+            # cached for health.ttl, so frequent polls don't probe it every time
+            if not self.processor.health_monitor.is_healthy():
+                self.logger.warning(f"Gateway not available, leaving {len(ready) - handled} files in the inbox")
+                break
+            try:
+                self.process_file(path)
+            except GatewayUnavailableError as e:
+                self.logger.warning(f"{str(e)} Leaving {len(ready) - handled} files in the inbox")
+                break
+            handled += 1
+        return handled
+    
+    def ready_files(self) -> List[str]:
+        """Input files in the inbox whose size and mtime held still for settle_seconds, oldest first"""
+        now = time.monotonic()
+        ready = []
+        current = {}
+        for entry in os.scandir(self.inbox_dir):
+            if not entry.is_file() or not entry.name.lower().endswith(SUPPORTED_EXTENSIONS):
+                continue
+            # Hidden files and Office lock files (~$name.xlsx) are never inputs
+            if entry.name.startswith(('.', '~$')) or entry.path in self._unmovable:
+                continue
+            stat = entry.stat()
+            signature = (stat.st_size, stat.st_mtime)
+            previous = self._seen.get(entry.path)
+            first_seen = previous[2] if previous is not None and previous[:2] == signature else now
+            current[entry.path] = (*signature, first_seen)
+            if now - first_seen >= self.settle_seconds:
+                ready.append((stat.st_mtime, entry.path))
+        self._seen = current
+        return [path for _, path in sorted(ready)]
+    
+    def process_file(self, path: str) -> bool:
+        """
+        Send one inbox file and move it to done_dir, or to failed_dir when it raised
+        GatewayUnavailableError is passed on and the file left in the inbox,
+        nothing of it was sent and it is retried once a gateway is back
+        """
+        self.logger.info(f"Picked up {path}")
+        try:
+            result, validation_errors = self.processor.process_excel_file(path, streaming=self.streaming)
+        except GatewayUnavailableError:
+            raise
+        except Exception as e:
+            self.failed += 1
+            destination = self._move(path, self.failed_dir)
+            self.logger.error(f"Failed {os.path.basename(path)}, moved to {destination}: {str(e)}")
+            return False
+        
+        self.processed += 1
+        destination = self._move(path, self.done_dir)
+        self.logger.info(f"Done {os.path.basename(path)} (batch {result.batch_id}): {result.successful} sent, "
+                         f"{result.failed} failed, {len(validation_errors)} validation errors, moved to {destination}")
+        return True
+    
+    def _move(self, path: str, directory: str) -> Optional[str]:
+        """Move path into directory, never overwriting an earlier file of the same name"""
+        self._seen.pop(path, None)
+        name, extension = os.path.splitext(os.path.basename(path))
+        destination = os.path.join(directory, name + extension)
+        if os.path.exists(destination):
+            destination = os.path.join(directory, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}{extension}")
+        try:
+            shutil.move(path, destination)
+        except OSError as e:
+            # Leave it where it is, but don't send it again
+            self._unmovable.add(path)
+            self.logger.error(f"Could not move {path} to {directory}: {str(e)}")
+            return None
+        return destination
@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Hashable, List, Optional, Set
+
+from src.core.models import Contact, ProcessingResult
+
+def row_key(contact: Contact) -> Hashable:
+    """
+    Journal identity of a contact: its row and phone, plus the file in multi-file batches
+    The phone guards against a re-exported sheet where another patient now
+    sits on a row that was already sent
+    """
+    if contact.source_file is None:
+        return (contact.row_index, contact.phone)
+    return (contact.source_file, contact.row_index, contact.phone)
+
+class SendJournal:
+    """
+    Append-only JSONL record of send outcomes for one batch, one line per contact
+    Lines are buffered and written with a single fsync every flush_every
+    records or flush_interval seconds, so journaling keeps up with the gateway.
+    A crash loses at most the unflushed tail, which is then sent again on resume
+    """
+    def __init__(self, directory: str, batch_id: str, flush_every: int = 500, flush_interval: float = 1.0):
+        self.batch_id = batch_id
+        self.path = os.path.join(directory, f"{batch_id}.jsonl")
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._buffer: List[str] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+    
+    def __enter__(self) -> "SendJournal":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    @staticmethod
+    def exists(directory: str, batch_id: str) -> bool:
+        return os.path.exists(os.path.join(directory, f"{batch_id}.jsonl"))
+    
+    def write_header(self, source_file: str):
+        """Note which file(s) the batch was started from"""
+        self._append([json.dumps({'batch_id': self.batch_id, 'file': source_file, 'started': time.time()})])
+    
+    def source_file(self) -> Optional[str]:
+        """File(s) the batch was started from, as noted by write_header"""
+        self.flush()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if 'batch_id' in entry:
+                    return entry.get('file')
+        return None
+    
+    def completed_rows(self) -> Set[Hashable]:
+        """row_key of every contact whose latest recorded outcome is 'sent'"""
+        self.flush()
+        latest: Dict[Hashable, str] = {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn last line from a crash mid-write
+                    continue
+                if 'row' in entry:
+                    key = (entry['row'], entry.get('phone'))
+                    if 'file' in entry:
+                        key = (entry['file'], *key)
+                    latest[key] = entry['status']
+        return {row for row, status in latest.items() if status == "sent"}
+    
+    def record(self, results: List[ProcessingResult]):
+        """Queue one line per result, flushing when the buffer is full or old enough"""
+        self._append([json.dumps(self._entry(result), ensure_ascii=False) for result in results])
+    
+    def _entry(self, result: ProcessingResult) -> Dict:
+        entry = {
+            'row': result.contact.row_index,
+            'status': result.status,
+            'phone': result.contact.phone,
+            'attempts': result.attempts,
+            'error': result.error_message,
+            'ts': result.timestamp.timestamp()
+        }
+        if result.contact.source_file is not None:
+            entry['file'] = result.contact.source_file
+        return entry
+    
+    def _append(self, lines: List[str]):
+        with self._lock:
+            self._buffer.extend(lines)
+            if len(self._buffer) >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+    
+    def flush(self):
+        """Write buffered lines and fsync them"""
+        with self._lock:
+            self._flush_locked()
+    
+    def _flush_locked(self):
+        if self._buffer:
+            self._file.write('\n'.join(self._buffer) + '\n')
+            self._buffer = []
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._last_flush = time.monotonic()
+    
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
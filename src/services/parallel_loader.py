@@ -0,0 +1,64 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from src.core.excel_processor import ExcelProcessor
+from src.core.models import Contact
+from src.core.parse_cache import ParseCache
+
+@dataclass
+class FileLoad:
+    """Parse outcome of one file of a multi-file batch"""
+    path: str
+    contacts: List[Contact]
+    errors: List[Dict]
+    parse_time: float
+    error: Optional[str] = None  # set when the file could not be read at all
+
+def load_file(path: str, cache: Optional[ParseCache] = None, extra_columns: Sequence[str] = ()) -> FileLoad:
+    """
+    Parse one file, tagging contacts and row errors with the file they came from
+    Module level so it can run in a worker process
+    """
+    start = time.perf_counter()
+    try:
+        contacts, errors = ExcelProcessor(cache, extra_columns).load_contacts_from_excel(path)
+    except Exception as e:
+        return FileLoad(path=path, contacts=[], errors=[], parse_time=time.perf_counter() - start, error=str(e))
+    
+    for contact in contacts:
+        contact.source_file = path
+    for error in errors:
+        error['file'] = path
+    return FileLoad(path=path, contacts=contacts, errors=errors, parse_time=time.perf_counter() - start)
+
+class ParallelFileLoader:
+    """
+    Parses several Excel files at once, one file per worker process
+    Parsing is CPU-bound pandas/openpyxl work, so processes (not threads) are
+    what spreads it over the cores. Files are yielded as they finish, so the
+    caller can start sending the first file while the others are still parsed
+    """
+    def __init__(self, workers: int = 0, cache: Optional[ParseCache] = None, extra_columns: Sequence[str] = ()):
+        self.workers = workers
+        self.cache = cache
+        self.extra_columns = list(extra_columns)
+    
+    def load(self, paths: List[str]) -> Iterator[FileLoad]:
+        """Yield a FileLoad per path, in completion order"""
+        workers = min(self.workers or os.cpu_count() or 1, len(paths))
+        if workers <= 1:
+            for path in paths:
+                yield load_file(path, self.cache, self.extra_columns)
+            return
+        
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = [executor.submit(load_file, path, self.cache, self.extra_columns) for path in paths]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # Don't parse files nobody will send when the caller stops early
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,62 @@
+import queue
+import threading
+from typing import Generic, Iterable, Iterator, TypeVar
+
+T = TypeVar('T')
+
+_DONE = object()
+
+class Prefetcher(Generic[T]):
+    """
+    Runs a producer iterable on a background thread, handing items to the
+    consumer through a bounded queue
+    The producer blocks once `depth` items are waiting, which is the
+    backpressure: parsing never runs more than `depth` chunks ahead of sending.
+    Producer exceptions are re-raised on the consumer side
+    """
+    def __init__(self, producer: Iterable[T], depth: int = 4, name: str = "prefetcher"):
+        self._producer = producer
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, depth))
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        try:
+            for item in self._producer:
+                if not self._put((item, None)):
+                    # Consumer went away: close the producer now, so a generator
+                    # releases what it holds (e.g. an open workbook) without waiting for GC
+                    close = getattr(self._producer, 'close', None)
+                    if close is not None:
+                        close()
+                    return
+            self._put((_DONE, None))
+        except BaseException as e:
+            self._put((_DONE, e))
+    
+    def _put(self, entry) -> bool:
+        """Queue an entry, giving up if the consumer went away"""
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def __iter__(self) -> Iterator[T]:
+        try:
+            while True:
+                item, error = self._queue.get()
+                if item is _DONE:
+                    if error is not None:
+                        raise error
+                    return
+                yield item
+        finally:
+            self.close()
+    
+    def close(self):
+        """Stop the producer, safe to call more than once"""
+        self._stopped.set()
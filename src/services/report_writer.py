@@ -0,0 +1,198 @@
+import csv
+import json
+import os
+import queue
+import threading
+from typing import Any, Dict, List, Optional
+
+from src.core.models import ProcessingResult
+
+# One row per input row that was sent, failed, rejected by validation or skipped as a duplicate
+REPORT_COLUMNS = ['file', 'row', 'name', 'phone', 'message', 'message_type', 'status', 'error', 'attempts', 'timestamp']
+
+# Rows per worksheet, Excel's limit minus the header
+XLSX_MAX_ROWS = 1048575
+
+def result_row(result: ProcessingResult) -> Dict[str, Any]:
+    """Report row for a send outcome"""
+    contact = result.contact
+    return {
+        'file': os.path.basename(contact.source_file) if contact.source_file else '',
+        'row': contact.row_index,
+        'name': contact.name,
+        'phone': contact.phone,
+        'message': contact.message,
+        'message_type': contact.message_type,
+        'status': result.status,
+        'error': result.error_message or '',
+        'attempts': result.attempts,
+        'timestamp': result.timestamp.isoformat(timespec='seconds')
+    }
+
+def error_row(entry: Dict) -> Dict[str, Any]:
+    """Report row for a validation error or duplicate skip entry"""
+    return {
+        'file': os.path.basename(entry['file']) if 'file' in entry else '',
+        'row': entry['row_index'],
+        'name': entry['name'],
+        'phone': entry['phone_attempted'],
+        'message': '',
+        'message_type': '',
+        'status': 'skipped' if entry.get('type') == 'duplicate' else 'invalid',
+        'error': entry['error'],
+        'attempts': 0,
+        'timestamp': ''
+    }
+
+class CsvReport:
+    """CSV with a BOM, so Excel opens accented names correctly"""
+    extension = 'csv'
+    
+    def __init__(self, path: str):
+        self._file = open(path, 'w', encoding='utf-8-sig', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=REPORT_COLUMNS)
+        self._writer.writeheader()
+    
+    def write_rows(self, rows: List[Dict[str, Any]]):
+        self._writer.writerows(rows)
+    
+    def close(self):
+        self._file.close()
+
+class JsonlReport:
+    """One JSON object per line, for other programs"""
+    extension = 'jsonl'
+    
+    def __init__(self, path: str):
+        self._file = open(path, 'w', encoding='utf-8')
+    
+    def write_rows(self, rows: List[Dict[str, Any]]):
+        self._file.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+    
+    def close(self):
+        self._file.close()
+
+class XlsxReport:
+    """
+    Workbook written with openpyxl's write-only mode, which streams rows to a
+    temporary file instead of holding the sheet in memory; the .xlsx itself
+    is assembled on close. Rows past Excel's limit continue on a new sheet
+    """
+    extension = 'xlsx'
+    
+    def __init__(self, path: str):
+        from openpyxl import Workbook
+        
+        self.path = path
+        self._workbook = Workbook(write_only=True)
+        self._sheet = None
+        self._sheet_rows = 0
+        self._new_sheet()
+    
+    def _new_sheet(self):
+        title = "Report" if self._sheet is None else f"Report {len(self._workbook.worksheets) + 1}"
+        self._sheet = self._workbook.create_sheet(title)
+        self._sheet.freeze_panes = 'A2'
+        for column, width in zip('ABCDEFGHIJ', (18, 8, 30, 20, 40, 12, 10, 50, 9, 20)):
+            self._sheet.column_dimensions[column].width = width
+        self._sheet.append(REPORT_COLUMNS)
+        self._sheet_rows = 0
+    
+    def write_rows(self, rows: List[Dict[str, Any]]):
+        for row in rows:
+            if self._sheet_rows >= XLSX_MAX_ROWS:
+                self._new_sheet()
+            self._sheet.append([row[column] for column in REPORT_COLUMNS])
+            self._sheet_rows += 1
+    
+    def close(self):
+        self._workbook.save(self.path)
+
+REPORT_FORMATS = {report.extension: report for report in (CsvReport, JsonlReport, XlsxReport)}
+
+class BatchReport:
+    """
+    Per-row outcome report of one batch, written to one file per format as results arrive
+    Each row is self-contained (file, row, name, phone, message, status and
+    error), so the report can be handed to the clinic without the source
+    workbook. Rows are written in the order outcomes are known: validation
+    errors as files are parsed, send results as chunks finish.
+    Formatting and writing happen on a background thread fed through a
+    bounded queue, so a slow format (xlsx) doesn't hold up sending
+    """
+    def __init__(self, directory: str, batch_id: str, formats: List[str], depth: int = 64):
+        unknown = [name for name in formats if name not in REPORT_FORMATS]
+        if unknown:
+            raise ValueError(f"Unknown report format(s) {', '.join(unknown)}, expected {', '.join(REPORT_FORMATS)}")
+        
+        os.makedirs(directory, exist_ok=True)
+        self.batch_id = batch_id
+        self.paths: List[str] = []
+        self._reports = []
+        for name in dict.fromkeys(formats):
+            path = self._free_path(directory, batch_id, name)
+            self._reports.append(REPORT_FORMATS[name](path))
+            self.paths.append(path)
+        
+        self._error: Optional[BaseException] = None
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, depth))
+        self._thread = threading.Thread(target=self._run, name=f"report-{batch_id}", daemon=True)
+        self._thread.start()
+    
+    @classmethod
+    def from_dict(cls, settings: Optional[Dict[str, Any]], batch_id: str) -> Optional["BatchReport"]:
+        """Build from the `reports` config section, None when no directory or format is set"""
+        settings = settings or {}
+        directory = settings.get('directory')
+        formats = settings.get('formats') or []
+        if not directory or not formats:
+            return None
+        return cls(directory, batch_id, formats)
+    
+    @staticmethod
+    def _free_path(directory: str, batch_id: str, extension: str) -> str:
+        """<batch_id>.<ext>, numbered when a resumed batch already has a report"""
+        path = os.path.join(directory, f"{batch_id}.{extension}")
+        attempt = 1
+        while os.path.exists(path):
+            attempt += 1
+            path = os.path.join(directory, f"{batch_id}_{attempt}.{extension}")
+        return path
+    
+    def record_results(self, results: List[ProcessingResult]):
+        if results:
+            self._queue.put((result_row, results))
+    
+    def record_errors(self, entries: List[Dict]):
+        if entries:
+            self._queue.put((error_row, entries))
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if self._error is not None:
+                # Keep draining so producers never block on a dead writer
+                continue
+            to_row, records = item
+            try:
+                rows = [to_row(record) for record in records]
+                for report in self._reports:
+                    report.write_rows(rows)
+            except BaseException as e:
+                self._error = e
+        
+        for report in self._reports:
+            try:
+                report.close()
+            except BaseException as e:
+                self._error = self._error or e
+    
+    def close(self):
+        """Write what is queued and close the files, raises if writing failed"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
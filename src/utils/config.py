@@ -12,15 +12,82 @@ class Config:
         default_config = {
             'gateway': {
                 'base_url': 'http://localhost:8080',
+                'base_urls': [],
+                'routing': 'round_robin',
+                'sticky_ddd': False,
                 'timeout': 30
             },
             'processing': {
                 'batch_size': 50,
-                'delay_between_messages': 0.5
+                'delay_between_messages': 0.5,
+                'read_chunk_size': 1000,
+                'max_in_flight_chunks': 4,
+                'max_concurrent_sends': 100,
+                'burst_size': 10,
+                'pipeline_depth': 4,
+                'parse_workers': 0
+            },
+            'retry': {
+                'max_attempts': 3,
+                'backoff_base': 0.5,
+                'backoff_max': 30,
+                'retry_statuses': [429, 502, 503, 504],
+                'retry_failed_contacts': True
+            },
+            'health': {
+                'interval': 10,
+                'recovery_interval': 1,
+                'ttl': 5,
+                'timeout': 5,
+                'failure_threshold': 3,
+                'reset_seconds': 30,
+                'max_outage_seconds': 60
+            },
+            'scheduling': {
+                'enabled': False,
+                'rules': [],
+                'default_priority': 5,
+                'deadline_column': None,
+                'date_format': '%d/%m/%Y',
+                'lookahead_rows': 5000
+            },
+            'deduplication': {
+                'enabled': True,
+                'key': 'message',
+                'index_file': '',
+                'ttl_hours': 24
+            },
+            'journal': {
+                'directory': 'journal'
+            },
+            'cache': {
+                'enabled': True,
+                'directory': '.parse_cache',
+                'max_size_mb': 500,
+                'max_age_hours': 168
+            },
+            'reports': {
+                'directory': 'reports',
+                'formats': ['csv', 'xlsx'],
+                'console_rows': 10
+            },
+            'metrics': {
+                'json_dir': 'metrics',
+                'prometheus_port': 0
+            },
+            'watch': {
+                'inbox_dir': 'inbox',
+                'done_dir': 'done',
+                'failed_dir': 'failed',
+                'poll_interval': 5,
+                'settle_seconds': 2
             },
             'logging': {
                 'level': 'INFO',
-                'file': 'sms_automation.log'
+                'file': 'sms_automation.log',
+                'max_bytes': 10485760,
+                'backup_count': 5,
+                'sample_warnings': 5
             }
         }
         
@@ -1,23 +1,89 @@
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
 
-def get_logger(name: str) -> logging.Logger:
-    """Configure and return logger"""
-    logger = logging.getLogger(name)
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+def configure_logging(level: str = "INFO", log_file: Optional[str] = None, max_bytes: int = 10 * 1024 * 1024,
+                      backup_count: int = 5, console: bool = True):
+    """
+    Route all logging through a queue to a background listener thread
+    Callers only pay for putting the record on the queue; formatting and the
+    console/file writes happen on the listener. log_file is rotated once it
+    reaches max_bytes, keeping backup_count old files. Calling it again
+    replaces the previous setup
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, QueueHandler) and hasattr(handler, 'listener'):
+            atexit.unregister(handler.listener.stop)
+            handler.listener.stop()
+            root.removeHandler(handler)
     
-    if not logger.handlers:
-        logger.setLevel(logging.INFO)
-        
-        # Console handler
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setLevel(logging.INFO)
-        
-        # Formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    if console:
+        handlers.append(logging.StreamHandler(sys.stdout))
+    if log_file:
+        handlers.append(RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'))
+    for handler in handlers:
         handler.setFormatter(formatter)
-        
-        logger.addHandler(handler)
     
-    return logger
\ No newline at end of file
+    log_queue: "queue.Queue" = queue.Queue(-1)
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    queue_handler.listener.start()
+    # Drain the queue at exit, so the last records aren't lost
+    atexit.register(queue_handler.listener.stop)
+    
+    root.addHandler(queue_handler)
+    root.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+
+def configure_from_config(config):
+    """configure_logging from the `logging` section of a Config"""
+    configure_logging(
+        level=config.get('logging.level', 'INFO'),
+        log_file=config.get('logging.file'),
+        max_bytes=config.get('logging.max_bytes', 10 * 1024 * 1024),
+        backup_count=config.get('logging.backup_count', 5)
+    )
+
+def get_logger(name: str) -> logging.Logger:
+    """Configure and return logger, logging goes to the console at INFO until configure_logging is called"""
+    root = logging.getLogger()
+    if not any(isinstance(handler, QueueHandler) for handler in root.handlers):
+        configure_logging()
+    return logging.getLogger(name)
+
+class SampledWarnings:
+    """
+    Per-batch warning aggregator for the hot path
+    The first `samples` warnings are logged as they come, the rest are only
+    counted by reason; summary() then logs one line per reason. At most
+    max_reasons distinct reasons are tracked, later ones count as 'other'
+    """
+    def __init__(self, logger: logging.Logger, samples: int = 5, max_reasons: int = 20):
+        self.logger = logger
+        self.samples = samples
+        self.max_reasons = max_reasons
+        self.total = 0
+        self.reasons: Dict[str, int] = {}
+    
+    def warn(self, reason: str, message: str):
+        self.total += 1
+        if reason not in self.reasons and len(self.reasons) >= self.max_reasons:
+            reason = 'other'
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+        if self.total <= self.samples:
+            self.logger.warning(message)
+    
+    def summary(self, label: str):
+        """Log the counts per reason when more warnings came in than were logged"""
+        if self.total <= self.samples:
+            return
+        self.logger.warning(f"{label}: {self.total} warnings, {self.total - self.samples} not logged individually")
+        for reason, count in sorted(self.reasons.items(), key=lambda item: item[1], reverse=True):
+            self.logger.warning(f"{label}:   {count} x {reason}")
@@ -0,0 +1,190 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, Optional
+
+# Request latency buckets in seconds, upper bounds (Prometheus style)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram, constant memory however many requests are observed
+    Quantiles are interpolated within the bucket they fall in
+    """
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+    
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+    
+    def merge(self, other: "LatencyHistogram"):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+    
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+    
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.quantile(0.50),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'max': self.max
+        }
+
+class BatchMetrics:
+    """
+    Stage durations, counters and gateway latency histograms for one batch (or a running total)
+    Stages accumulate, so a stage entered once per chunk adds up to the batch's
+    time in it; with streaming, parse and send overlap and their sum can exceed
+    the total. Safe to update from the send worker threads
+    """
+    def __init__(self, batch_id: Optional[str] = None):
+        self.batch_id = batch_id
+        self.started = time.time()
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block into stage `name`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+    
+    def add_time(self, name: str, seconds: float):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+    
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+    
+    def observe_request(self, endpoint: str, seconds: float, status: str):
+        """One gateway request: its latency and its outcome ('200', '503', 'error', ...)"""
+        with self._lock:
+            histogram = self.latency.get(endpoint)
+            if histogram is None:
+                histogram = self.latency[endpoint] = LatencyHistogram()
+            histogram.observe(seconds)
+            key = f"requests_{status}"
+            self.counters[key] = self.counters.get(key, 0) + 1
+    
+    def merge(self, other: "BatchMetrics"):
+        """Add another batch's numbers into this one"""
+        with self._lock, other._lock:
+            for name, seconds in other.stages.items():
+                self.stages[name] = self.stages.get(name, 0.0) + seconds
+            for name, amount in other.counters.items():
+                self.counters[name] = self.counters.get(name, 0) + amount
+            for endpoint, histogram in other.latency.items():
+                self.latency.setdefault(endpoint, LatencyHistogram()).merge(histogram)
+    
+    def throughput(self) -> Dict[str, float]:
+        """
+        rows/s over the parse stages ('read' + 'validate' in process, 'parse'
+        for files parsed by worker processes) and messages/s over the send stage
+        """
+        parse_seconds = sum(self.stages.get(name, 0.0) for name in ('read', 'validate', 'parse'))
+        send_seconds = self.stages.get('send', 0.0)
+        rows = self.counters.get('rows_parsed', 0)
+        messages = self.counters.get('messages_sent', 0) + self.counters.get('messages_failed', 0)
+        return {
+            'rows_per_second': rows / parse_seconds if parse_seconds else 0.0,
+            'messages_per_second': messages / send_seconds if send_seconds else 0.0
+        }
+    
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'batch_id': self.batch_id,
+                'started': self.started,
+                'stages': dict(self.stages),
+                'counters': dict(self.counters),
+                'throughput': self.throughput(),
+                'latency': {endpoint: histogram.to_dict() for endpoint, histogram in self.latency.items()}
+            }
+    
+    def write_json(self, directory: str) -> str:
+        """Write to <directory>/<batch_id>.json, returns the path"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.batch_id or 'metrics'}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+    
+    def to_prometheus(self, prefix: str = "iaso") -> str:
+        """Prometheus text exposition format"""
+        lines = [f"# TYPE {prefix}_stage_seconds_total counter"]
+        with self._lock:
+            for name, seconds in sorted(self.stages.items()):
+                lines.append(f'{prefix}_stage_seconds_total{{stage="{name}"}} {seconds:.6f}')
+            lines.append(f"# TYPE {prefix}_events_total counter")
+            for name, amount in sorted(self.counters.items()):
+                lines.append(f'{prefix}_events_total{{event="{name}"}} {amount}')
+            lines.append(f"# TYPE {prefix}_gateway_request_seconds histogram")
+            for endpoint, histogram in sorted(self.latency.items()):
+                cumulative = 0
+                for bound, count in zip(list(histogram.buckets) + ['+Inf'], histogram.counts):
+                    cumulative += count
+                    lines.append(f'{prefix}_gateway_request_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_gateway_request_seconds_sum{{endpoint="{endpoint}"}} {histogram.sum:.6f}')
+                lines.append(f'{prefix}_gateway_request_seconds_count{{endpoint="{endpoint}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+class MetricsServer:
+    """Serves render() as Prometheus text on http://<host>:<port>/metrics from a daemon thread"""
+    def __init__(self, render: Callable[[], str], port: int, host: str = "0.0.0.0"):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,243 @@
+"""
+End-to-end benchmark of BatchProcessor against the load-test gateway
+Generates synthetic inputs (tests/generate_excel.py) of each size once,
+starts tests/load_test_gateway.py, and runs every size/mode in a fresh
+process, reporting parse rows/s, send messages/s, peak RSS, end-to-end time
+and gateway latency. Reports are JSON; --compare prints the change against
+an earlier report and flags regressions
+
+    python tests/benchmark_pipeline.py [--sizes 1k,100k,1m] [--modes sync,stream,async] [--runs 3]
+        [--latency-ms 20] [--output bench.json] [--compare baseline.json [--fail-on-regression]]
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GATEWAY = os.path.join(ROOT, "tests", "load_test_gateway.py")
+MODES = ("sync", "stream", "async")
+
+# Reported metrics and whether a higher value is better
+METRICS = {
+    "parse_rows_per_second": True,
+    "send_messages_per_second": True,
+    "end_to_end_seconds": False,
+    "peak_rss_mb": False,
+    "gateway_p50_ms": False,
+    "gateway_p95_ms": False,
+}
+
+def parse_size(text):
+    """'1k' -> 1000, '1m' -> 1000000"""
+    text = text.strip().lower()
+    multiplier = {"k": 1000, "m": 1000000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * multiplier)
+
+def run_worker(input_path, gateway_url, mode):
+    """Inside the benchmark subprocess: one batch, metrics printed as JSON on the last line"""
+    import asyncio
+    import resource
+    
+    sys.path.insert(0, ROOT)
+    from src.utils.logger import configure_logging
+    from src.services.batch_processor import BatchProcessor
+    
+    configure_logging(level="WARNING", console=False)
+    # No rate limiting, retries, dedup, journal, cache or reports: only parsing and sending are measured
+    processor = BatchProcessor(gateway_url, batch_size=50, max_in_flight=4, retry_settings={"max_attempts": 1})
+    
+    start = time.perf_counter()
+    if mode == "async":
+        result, validation_errors = asyncio.run(processor.process_excel_file_async(input_path))
+    else:
+        result, validation_errors = processor.process_excel_file(input_path, streaming=mode == "stream")
+    elapsed = time.perf_counter() - start
+    
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+    metrics = result.metrics
+    latency = metrics["latency"].get("sms_batch", {})
+    print(json.dumps({
+        "end_to_end_seconds": elapsed,
+        "parse_rows_per_second": metrics["throughput"]["rows_per_second"],
+        "send_messages_per_second": metrics["throughput"]["messages_per_second"],
+        "peak_rss_mb": peak_rss_mb,
+        "gateway_p50_ms": latency.get("p50", 0.0) * 1000,
+        "gateway_p95_ms": latency.get("p95", 0.0) * 1000,
+        "gateway_p99_ms": latency.get("p99", 0.0) * 1000,
+        "stages": metrics["stages"],
+        "sent": result.successful,
+        "failed": result.failed,
+        "validation_errors": len(validation_errors),
+    }))
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_gateway(args):
+    """Load-test gateway subprocess and its URL, once it answers /health"""
+    port = free_port()
+    process = subprocess.Popen([
+        sys.executable, GATEWAY, "--port", str(port), "--quiet",
+        "--latency", args.latency, "--latency-ms", str(args.latency_ms),
+        "--latency-spread-ms", str(args.latency_spread_ms), "--failure-rate", str(args.failure_rate),
+        "--rate-cap", str(args.rate_cap), "--seed", "0",
+    ], stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"{url}/health", timeout=1).close()
+            return process, url
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Load-test gateway did not start")
+
+def ensure_input(data_dir, rows, file_format):
+    """Synthetic input of `rows` contacts, generated on first use"""
+    sys.path.insert(0, os.path.join(ROOT, "tests"))
+    from generate_excel import write_csv, write_workbook
+    
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"contacts_{rows}.{file_format}")
+    if not os.path.exists(path):
+        print(f"🛠️  Generating {path}...", flush=True)
+        start = time.perf_counter()
+        (write_csv if file_format == "csv" else write_workbook)(path, rows)
+        print(f"   done in {time.perf_counter() - start:.1f}s", flush=True)
+    return path
+
+def benchmark(input_path, gateway_url, mode, runs):
+    """Median of each metric over `runs` fresh processes"""
+    samples = []
+    for _ in range(runs):
+        completed = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", input_path,
+                                    "--gateway", gateway_url, "--mode", mode],
+                                   cwd=ROOT, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"Benchmark run failed:\n{completed.stderr[-2000:]}")
+        samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    
+    entry = {key: statistics.median(sample[key] for sample in samples)
+             for key, value in samples[0].items() if isinstance(value, (int, float))}
+    entry["stages"] = samples[len(samples) // 2]["stages"]
+    return entry
+
+def compare(report, baseline, tolerance):
+    """Print the change of every metric against the baseline, returns the number of regressions"""
+    previous = {(entry["rows"], entry["mode"]): entry for entry in baseline["results"]}
+    regressions = 0
+    print(f"\n📈 Compared with {baseline.get('git_commit') or 'baseline'} from {baseline.get('created', '?')}:")
+    for entry in report["results"]:
+        old = previous.get((entry["rows"], entry["mode"]))
+        if old is None:
+            continue
+        changes = []
+        for metric, higher_is_better in METRICS.items():
+            if not old.get(metric):
+                continue
+            change = (entry[metric] - old[metric]) / old[metric]
+            worse = -change if higher_is_better else change
+            flag = ""
+            if worse > tolerance:
+                regressions += 1
+                flag = " ⚠️"
+            changes.append(f"{metric} {change:+.1%}{flag}")
+        print(f"   {entry['rows']} rows/{entry['mode']}: {', '.join(changes)}")
+    return regressions
+
+def git_commit():
+    completed = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    return completed.stdout.strip() or None
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end BatchProcessor benchmark against the load-test gateway")
+    parser.add_argument("--sizes", default="1k,100k", help="Comma-separated row counts, k/m suffixes allowed (e.g. 1k,100k,1m)")
+    parser.add_argument("--modes", default="sync,stream", help=f"Comma-separated, from {', '.join(MODES)}")
+    parser.add_argument("--runs", type=int, default=1, help="Runs per size and mode, medians are reported")
+    parser.add_argument("--format", choices=("xlsx", "csv"), default="xlsx", help="Input file format")
+    parser.add_argument("--data-dir", default=os.path.join(ROOT, "bench_data"), help="Where generated inputs are kept")
+    parser.add_argument("--gateway", help="Use this gateway instead of starting the load-test one")
+    parser.add_argument("--latency", default="lognormal", help="Load-test gateway latency distribution")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--latency-spread-ms", type=float, default=10.0)
+    parser.add_argument("--failure-rate", type=float, default=0.01)
+    parser.add_argument("--rate-cap", type=float, default=0.0)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="Earlier report to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Relative change counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 when --compare finds a regression")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.worker:
+        run_worker(args.worker, args.gateway, args.mode)
+        return
+    
+    modes = [mode.strip() for mode in args.modes.split(",")]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f"unknown mode(s) {', '.join(unknown)}")
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    
+    gateway_process = None
+    gateway_url = args.gateway
+    if gateway_url is None:
+        gateway_process, gateway_url = start_gateway(args)
+    
+    report = {
+        "schema_version": 1,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "input_format": args.format,
+        "gateway": args.gateway or {"latency": args.latency, "latency_ms": args.latency_ms,
+                                    "latency_spread_ms": args.latency_spread_ms,
+                                    "failure_rate": args.failure_rate, "rate_cap": args.rate_cap},
+        "results": [],
+    }
+    try:
+        for rows in sizes:
+            input_path = ensure_input(args.data_dir, rows, args.format)
+            for mode in modes:
+                entry = {"rows": rows, "mode": mode, "runs": args.runs,
+                         **benchmark(input_path, gateway_url, mode, args.runs)}
+                report["results"].append(entry)
+                print(f"⏱️  {rows} rows/{mode}: {entry['end_to_end_seconds']:.2f}s end to end, "
+                      f"{entry['parse_rows_per_second']:.0f} rows/s parsed, "
+                      f"{entry['send_messages_per_second']:.0f} msg/s sent, "
+                      f"p95 {entry['gateway_p95_ms']:.0f}ms, peak RSS {entry['peak_rss_mb']:.0f} MB", flush=True)
+    finally:
+        if gateway_process is not None:
+            gateway_process.terminate()
+            gateway_process.wait()
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.output}")
+    
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions and args.fail_on_regression:
+            print(f"❌ {regressions} metrics regressed by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
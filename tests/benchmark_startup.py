@@ -0,0 +1,92 @@
+"""
+Startup-time benchmark for the CLI entry points
+Runs each entry point with `python -X importtime` a few times and reports the
+wall time, the total import time and the slowest top-level imports, so a heavy
+import creeping back into the fast paths shows up as a number
+
+    python tests/benchmark_startup.py [--runs 5] [--output startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "src", "main.py")
+SAMPLE = os.path.join(ROOT, "test_contacts.xlsx")
+
+ENTRY_POINTS = {
+    "help": [MAIN, "--help"],
+    "missing_file": [MAIN, "does_not_exist.xlsx"],
+    "validate_only": [MAIN, "--validate-only", SAMPLE],
+    "import_batch_processor": ["-c", f"import sys; sys.path[:0] = [{ROOT!r}, {os.path.join(ROOT, 'src')!r}]; "
+                                     "import services.batch_processor"],
+}
+
+def parse_importtime(stderr):
+    """
+    ({top-level module: cumulative microseconds}, every module imported)
+    from -X importtime output
+    """
+    top_level = {}
+    imported = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imported.add(name.strip())
+        # Nested imports are indented; their time is already in their parent's cumulative
+        if not name.startswith("  "):
+            top_level[name.strip()] = int(cumulative)
+    return top_level, imported
+
+def run_entry_point(args):
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-X", "importtime", *args],
+                               cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    wall = time.perf_counter() - start
+    return (wall, *parse_importtime(completed.stderr))
+
+def benchmark(runs):
+    report = {}
+    for name, args in ENTRY_POINTS.items():
+        walls, totals, last_modules, imported = [], [], {}, set()
+        for _ in range(runs):
+            wall, modules, imported = run_entry_point(args)
+            walls.append(wall)
+            totals.append(sum(modules.values()) / 1e6)
+            last_modules = modules
+        slowest = sorted(last_modules.items(), key=lambda item: item[1], reverse=True)[:5]
+        report[name] = {
+            "wall_seconds_median": statistics.median(walls),
+            "import_seconds_median": statistics.median(totals),
+            "slowest_imports": [{"module": module, "seconds": us / 1e6} for module, us in slowest],
+            "loads_http_stack": any(module.split(".")[0] in ("requests", "aiohttp", "urllib3")
+                                    for module in imported),
+            "loads_pandas": "pandas" in imported,
+        }
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure CLI startup and import cost per entry point")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per entry point, the median is reported")
+    parser.add_argument("--output", help="Also write the report as JSON to this file")
+    args = parser.parse_args()
+    
+    report = benchmark(args.runs)
+    for name, entry in report.items():
+        print(f"⏱️  {name}: {entry['wall_seconds_median']:.3f}s wall, {entry['import_seconds_median']:.3f}s importing"
+              f"{' (pandas)' if entry['loads_pandas'] else ''}{' (HTTP stack)' if entry['loads_http_stack'] else ''}")
+        for item in entry["slowest_imports"]:
+            print(f"      {item['module']}: {item['seconds']:.3f}s")
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
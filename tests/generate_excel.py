@@ -1,4 +1,16 @@
-import pandas as pd
+"""
+Test input generator
+Without arguments, writes the four-row test_contacts.xlsx used by the manual
+tests. With --rows, writes that many synthetic contacts (a share of them
+invalid) for benchmarks, streamed so a 1M-row workbook fits in memory
+
+    python tests/generate_excel.py
+    python tests/generate_excel.py --rows 100000 --output bench_100k.xlsx [--invalid-ratio 0.05]
+"""
+import argparse
+import csv
+import random
+from typing import Dict, Iterator
 
 test_data = [
     {
@@ -29,6 +41,84 @@ test_data = [
     }
 ]
 
-df = pd.DataFrame(test_data)
-df.to_excel("test_contacts.xlsx", index=False)
-print("✅ Created test_correct_contacts.xlsx with correct column names")
\ No newline at end of file
+COLUMNS = ["paciente", "tel.recado", "tel.celular", "message", "data.solicitacao", "diagnostico"]
+
+FIRST_NAMES = ["João", "Maria", "José", "Ana", "Pedro", "Francisca", "Carlos", "Antônia", "Paulo", "Juliana"]
+LAST_NAMES = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes"]
+DDDS = ["11", "21", "31", "41", "51", "61", "71", "81", "85", "92"]
+DIAGNOSES = ["consulta", "retorno", "cirurgia", "exame", ""]
+
+def synthetic_phone(rng: random.Random) -> str:
+    """A valid number in one of the formats seen in real sheets"""
+    ddd = rng.choice(DDDS)
+    prefix, suffix = rng.randint(2000, 9999), rng.randint(0, 9999)
+    style = rng.randrange(4)
+    if style == 0:
+        return f"{ddd} - {prefix} - {suffix:04d}"
+    if style == 1:
+        return f"({ddd}) 9{prefix}-{suffix:04d}"
+    if style == 2:
+        return f"+55 {ddd} 9{prefix} {suffix:04d}"
+    return f"{ddd}{prefix}{suffix:04d}"
+
+def synthetic_rows(rows: int, invalid_ratio: float = 0.05, seed: int = 0) -> Iterator[Dict[str, str]]:
+    """Contacts with a mix of phone formats; about invalid_ratio of them lack a name or a valid phone"""
+    rng = random.Random(seed)
+    for i in range(rows):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        row = {
+            "paciente": f"{first} {last}",
+            "tel.recado": synthetic_phone(rng) if rng.random() < 0.5 else "",
+            "tel.celular": synthetic_phone(rng),
+            "message": f"Olá {first}! Lembrete de consulta #{i}.",
+            "data.solicitacao": f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2025",
+            "diagnostico": rng.choice(DIAGNOSES)
+        }
+        if rng.random() < invalid_ratio:
+            if rng.random() < 0.5:
+                row["paciente"] = ""
+            else:
+                row["tel.recado"], row["tel.celular"] = "", f"00 - {rng.randint(1000, 9999)}"
+        yield row
+
+def write_workbook(path: str, rows: int, invalid_ratio: float = 0.05, seed: int = 0):
+    """Synthetic .xlsx written with openpyxl's write-only mode, row by row"""
+    from openpyxl import Workbook
+    
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(COLUMNS)
+    for row in synthetic_rows(rows, invalid_ratio, seed):
+        sheet.append([row[column] for column in COLUMNS])
+    workbook.save(path)
+
+def write_csv(path: str, rows: int, invalid_ratio: float = 0.05, seed: int = 0):
+    """Same contacts as write_workbook, as CSV"""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(synthetic_rows(rows, invalid_ratio, seed))
+
+def main():
+    parser = argparse.ArgumentParser(description="Write test input files")
+    parser.add_argument("--rows", type=int, help="Synthetic contacts to generate (default: the 4-row test sheet)")
+    parser.add_argument("--output", help="Output file, .xlsx or .csv")
+    parser.add_argument("--invalid-ratio", type=float, default=0.05, help="Share of rows that fail validation")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    if args.rows is None:
+        import pandas as pd
+        
+        df = pd.DataFrame(test_data)
+        df.to_excel(args.output or "test_contacts.xlsx", index=False)
+        print("✅ Created test_correct_contacts.xlsx with correct column names")
+        return
+    
+    output = args.output or f"contacts_{args.rows}.xlsx"
+    writer = write_csv if output.lower().endswith(".csv") else write_workbook
+    writer(output, args.rows, args.invalid_ratio, args.seed)
+    print(f"✅ Created {output} with {args.rows} synthetic contacts")
+
+if __name__ == "__main__":
+    main()
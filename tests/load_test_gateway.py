@@ -0,0 +1,256 @@
+"""
+Load-test stand-in for the Kotlin SMS gateway
+Speaks the gateway's API (GET /health, POST /api/sms/send, POST /api/sms/batch)
+with configurable latency, failures, throttling and a rate cap, and logs
+counters instead of every contact, so it can keep up with a benchmark.
+GET /stats returns the counters as JSON
+
+    python tests/load_test_gateway.py --port 8080 --latency lognormal --latency-ms 80 \\
+        --failure-rate 0.02 --throttle-rate 0.01 --rate-cap 500 --quiet
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+@dataclass
+class GatewayOptions:
+    latency: str = "fixed"          # one of LATENCY_DISTRIBUTIONS
+    latency_ms: float = 0.0         # mean request latency
+    latency_spread_ms: float = 0.0  # uniform half-width, normal/lognormal standard deviation
+    per_message_ms: float = 0.0     # added per contact of a batch request
+    failure_rate: float = 0.0       # share of contacts reported as failed, single sends get 422
+    error_rate: float = 0.0         # share of requests answered 503
+    throttle_rate: float = 0.0      # share of requests answered 429 with Retry-After
+    retry_after: float = 1.0        # Retry-After of random 429s, seconds
+    rate_cap: float = 0.0           # messages per second accepted, the rest get 429; 0 = no cap
+    seed: int = 0
+
+class LatencyModel:
+    """Samples request latencies, in seconds, from the configured distribution"""
+    def __init__(self, options: GatewayOptions, rng: random.Random):
+        if options.latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{options.latency}', expected one of {', '.join(LATENCY_DISTRIBUTIONS)}")
+        self.options = options
+        self.rng = rng
+        if options.latency == "lognormal" and options.latency_ms > 0:
+            # Parameters of the underlying normal that give the requested mean and spread
+            variance = math.log(1 + (options.latency_spread_ms / options.latency_ms) ** 2)
+            self._mu = math.log(options.latency_ms) - variance / 2
+            self._sigma = math.sqrt(variance)
+    
+    def sample(self, messages: int) -> float:
+        mean, spread = self.options.latency_ms, self.options.latency_spread_ms
+        kind = self.options.latency
+        if kind == "fixed" or mean <= 0:
+            ms = mean
+        elif kind == "uniform":
+            ms = self.rng.uniform(mean - spread, mean + spread)
+        elif kind == "normal":
+            ms = self.rng.gauss(mean, spread)
+        elif kind == "lognormal":
+            ms = self.rng.lognormvariate(self._mu, self._sigma)
+        else:
+            ms = self.rng.expovariate(1 / mean)
+        return max(0.0, ms + self.options.per_message_ms * messages) / 1000
+
+class RateCap:
+    """Token bucket of accepted messages, one second of burst"""
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+    
+    def take(self, messages: int) -> float:
+        """0 if the messages are accepted, else seconds until they would be"""
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= messages or self.tokens >= self.rate:
+            self.tokens -= messages
+            return 0.0
+        return (min(messages, self.rate) - self.tokens) / self.rate
+
+class GatewayState:
+    """Shared counters, random source and rate cap of one server"""
+    def __init__(self, options: GatewayOptions):
+        self.options = options
+        self.rng = random.Random(options.seed)
+        self.latency = LatencyModel(options, self.rng)
+        self.rate_cap = RateCap(options.rate_cap) if options.rate_cap > 0 else None
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.counters: Dict[str, int] = {'requests': 0, 'messages': 0, 'sent': 0, 'failed': 0}
+        self.statuses: Dict[str, int] = {}
+    
+    def decide(self, messages: int):
+        """(HTTP status, Retry-After or None, latency seconds) for a request carrying `messages`"""
+        with self.lock:
+            self.counters['requests'] += 1
+            latency = self.latency.sample(messages)
+            roll = self.rng.random()
+            if roll < self.options.error_rate:
+                return 503, None, latency
+            if roll < self.options.error_rate + self.options.throttle_rate:
+                return 429, self.options.retry_after, latency
+            if self.rate_cap is not None:
+                wait = self.rate_cap.take(messages)
+                if wait > 0:
+                    return 429, wait, 0.0
+            return 200, None, latency
+    
+    def outcomes(self, messages: int):
+        """Per-contact sent/failed flags"""
+        with self.lock:
+            failed = [self.rng.random() < self.options.failure_rate for _ in range(messages)]
+            self.counters['messages'] += messages
+            self.counters['failed'] += sum(failed)
+            self.counters['sent'] += messages - sum(failed)
+        return failed
+    
+    def count_status(self, status: int):
+        with self.lock:
+            self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+    
+    def stats(self) -> Dict:
+        with self.lock:
+            elapsed = time.time() - self.started
+            return {
+                **self.counters,
+                'statuses': dict(self.statuses),
+                'uptime_seconds': elapsed,
+                'messages_per_second': self.counters['messages'] / elapsed if elapsed else 0.0,
+                'options': asdict(self.options)
+            }
+
+def make_handler(state: GatewayState, verbose: bool):
+    class GatewayHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, like the real gateway
+        
+        def _reply(self, status: int, body: Dict, retry_after=None):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            if retry_after is not None:
+                self.send_header('Retry-After', f"{retry_after:.3f}")
+            self.end_headers()
+            self.wfile.write(data)
+            state.count_status(status)
+        
+        def do_GET(self):
+            if self.path == '/health':
+                self._reply(200, {"status": "healthy", "service": "load_test_gateway", "timestamp": int(time.time() * 1000)})
+            elif self.path == '/stats':
+                self._reply(200, state.stats())
+            else:
+                self._reply(404, {"error": "not found"})
+        
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            if self.path == '/api/sms/batch':
+                contacts = payload.get('contacts', [])
+            elif self.path == '/api/sms/send':
+                contacts = [payload]
+            else:
+                self._reply(404, {"error": "not found"})
+                return
+            
+            status, retry_after, latency = state.decide(len(contacts))
+            time.sleep(latency)
+            if status != 200:
+                self._reply(status, {"error": "throttled" if status == 429 else "unavailable"}, retry_after)
+                return
+            
+            failed = state.outcomes(len(contacts))
+            now = int(time.time() * 1000)
+            if self.path == '/api/sms/send':
+                # The client reads only the status code of a single send; 422, not a 5xx,
+                # so simulated failures don't trip the client's circuit breaker
+                if failed[0]:
+                    self._reply(422, {"status": "failed", "error": "Load test: simulated failure", "timestamp": now})
+                else:
+                    self._reply(200, {"status": "sent", "timestamp": now})
+                return
+            results = []
+            for contact, contact_failed in zip(contacts, failed):
+                result = {"status": "failed" if contact_failed else "sent",
+                          "error": "Load test: simulated failure" if contact_failed else None,
+                          "timestamp": now}
+                if 'id' in contact:
+                    result['id'] = contact['id']
+                results.append(result)
+            self._reply(200, {"results": results, "total": len(contacts),
+                              "successful": len(contacts) - sum(failed), "failed": sum(failed)})
+        
+        def log_message(self, format, *args):
+            if verbose:
+                print(f"🌐 {self.address_string()} - {format % args}")
+    
+    return GatewayHandler
+
+def serve(options: GatewayOptions, host: str = "127.0.0.1", port: int = 8080, verbose: bool = False) -> ThreadingHTTPServer:
+    """Server ready for serve_forever(), its counters in server.state; port 0 picks a free port"""
+    state = GatewayState(options)
+    server = ThreadingHTTPServer((host, port), make_handler(state, verbose))
+    server.daemon_threads = True
+    server.state = state
+    return server
+
+def report_loop(state: GatewayState, interval: float):
+    """Print one counters line every `interval` seconds"""
+    last = 0
+    while True:
+        time.sleep(interval)
+        stats = state.stats()
+        if stats['requests'] != last:
+            last = stats['requests']
+            print(f"📊 {stats['requests']} requests, {stats['messages']} messages "
+                  f"({stats['sent']} sent, {stats['failed']} failed), statuses {stats['statuses']}, "
+                  f"{stats['messages_per_second']:.0f} msg/s", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Kotlin gateway stand-in for load tests and benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="fixed", help="Request latency distribution")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean request latency")
+    parser.add_argument("--latency-spread-ms", type=float, default=0.0,
+                        help="Half-width (uniform) or standard deviation (normal, lognormal)")
+    parser.add_argument("--per-message-ms", type=float, default=0.0, help="Extra latency per contact in a batch")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of contacts reported as failed")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After of the random 429s, seconds")
+    parser.add_argument("--rate-cap", type=float, default=0.0, help="Messages per second accepted before answering 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quiet", action="store_true", help="No periodic counters line")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    parser.add_argument("--report-interval", type=float, default=5.0, help="Seconds between counters lines")
+    args = parser.parse_args()
+    
+    options = GatewayOptions(
+        latency=args.latency, latency_ms=args.latency_ms, latency_spread_ms=args.latency_spread_ms,
+        per_message_ms=args.per_message_ms, failure_rate=args.failure_rate, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate, retry_after=args.retry_after, rate_cap=args.rate_cap, seed=args.seed
+    )
+    server = serve(options, args.host, args.port, args.verbose)
+    print(f"🚀 Load test gateway on http://{args.host}:{server.server_address[1]} ({json.dumps(asdict(options))})", flush=True)
+    if not args.quiet:
+        threading.Thread(target=report_loop, args=(server.state, args.report_interval), daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
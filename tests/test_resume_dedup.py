@@ -0,0 +1,63 @@
+"""
+Resuming a batch must not send a row the first attempt skipped as a duplicate
+The journal only lists the rows that were sent; their in-file repeats have to
+be recognised as duplicates again instead of going out on resume
+
+    python -m pytest tests/test_resume_dedup.py
+"""
+import os
+import sys
+import threading
+
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.services.batch_processor import BatchProcessor
+from tests.load_test_gateway import GatewayOptions, serve
+
+ROWS = [
+    ["paciente", "tel.celular", "message"],
+    ["Ana Silva", 11999998888, "Lembrete"],
+    ["Bruno Lima", 11988887777, "Lembrete"],
+    ["Ana Silva", 11999998888, "Lembrete"],
+]
+
+def write_sheet(path):
+    workbook = Workbook()
+    sheet = workbook.active
+    for row in ROWS:
+        sheet.append(row)
+    workbook.save(path)
+
+def run_batch(gateway_url, journal_dir, path, streaming=False, resume_batch_id=None):
+    processor = BatchProcessor(gateway_url, journal_dir=journal_dir, dedup_settings={'enabled': True},
+                               health_settings={'interval': 0, 'max_outage_seconds': 0})
+    return processor.process_excel_file(path, streaming=streaming, resume_batch_id=resume_batch_id)
+
+def check_resume_skips_duplicate(tmp_path, streaming):
+    server = serve(GatewayOptions(), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        gateway_url = f"http://127.0.0.1:{server.server_address[1]}"
+        path = str(tmp_path / "duplicates.xlsx")
+        write_sheet(path)
+        journal_dir = str(tmp_path / "journal")
+        
+        result, errors = run_batch(gateway_url, journal_dir, path, streaming)
+        assert result.successful == 2
+        assert [error['row_index'] for error in errors if error['type'] == 'duplicate'] == [4]
+        sent = server.state.counters['messages']
+        
+        resumed, resumed_errors = run_batch(gateway_url, journal_dir, path, streaming, result.batch_id)
+        assert resumed.total_contacts == 0
+        assert server.state.counters['messages'] == sent
+        assert [error['row_index'] for error in resumed_errors if error['type'] == 'duplicate'] == [4]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_resume_skips_in_file_duplicate(tmp_path):
+    check_resume_skips_duplicate(tmp_path, streaming=False)
+
+def test_streamed_resume_skips_in_file_duplicate(tmp_path):
+    check_resume_skips_duplicate(tmp_path, streaming=True)
@@ -0,0 +1,50 @@
+"""
+Streamed and whole-file parsing must give the same contacts and errors
+pd.read_excel keeps numeric columns with blanks as float64, the streamed
+openpyxl reader converts cell by cell; both have to end up as the same text
+
+    python -m pytest tests/test_stream_parity.py
+"""
+import os
+import sys
+
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.core.excel_processor import ExcelProcessor
+
+ROWS = [
+    ["paciente", "tel.recado", "tel.celular", "message", "diagnostico"],
+    ["Ana Silva", 99998888, 11999998888, 1, 10],
+    ["Bruno Lima", None, 11988887777, 2.5, None],
+    ["Carla Souza", 11999997777, None, "Lembrete", 20],
+    [None, 99996666, 11977776666, "Sem nome", 30],
+    ["Davi Alves", 12345, None, 3, 40.5],
+]
+
+def write_sheet(path):
+    workbook = Workbook()
+    sheet = workbook.active
+    for row in ROWS:
+        sheet.append(row)
+    workbook.save(path)
+
+def as_tuples(contacts):
+    return [(c.name, c.phone, c.message, c.message_type, c.row_index, c.attributes) for c in contacts]
+
+def test_streamed_parse_matches_whole_file(tmp_path):
+    path = str(tmp_path / "numeric.xlsx")
+    write_sheet(path)
+    processor = ExcelProcessor(extra_columns=["diagnostico"])
+    
+    contacts, errors = processor.load_contacts_from_excel(path)
+    streamed_contacts, streamed_errors = [], []
+    for chunk_contacts, chunk_errors in processor.stream_contacts_from_excel(path, chunk_size=2):
+        streamed_contacts.extend(chunk_contacts)
+        streamed_errors.extend(chunk_errors)
+    
+    assert as_tuples(streamed_contacts) == as_tuples(contacts)
+    assert streamed_errors == errors
+    assert [c.message for c in contacts] == ["1", "2.5", "Lembrete"]
+    assert [c.attributes["diagnostico"] for c in contacts] == ["10", "", "20"]
+    assert any("'12345'" in error['phone_attempted'] for error in errors)